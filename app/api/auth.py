@@ -1,46 +1,49 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 
-from app.schemas.api.user import UserCreate, UserWithToken, Token, UserLogin, LogoutUserResponse
+from app.schemas.api.user import UserCreate, UserOut, UserWithToken, Token, UserLogin, LogoutUserResponse
 from app.db.session import get_db
 from app.repositories.auth import *
-from app.core.security import create_access_token, verify_password
-from datetime import timezone
+from app.core.security import create_access_token, hash_password_async, verify_password_async
+from datetime import datetime, timezone
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserWithToken)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+# /register and /login are async so a request waiting for bcrypt holds no threadpool thread: the database
+# work runs in the threadpool in short steps and the hash is awaited on the password pool in between.
+def _check_new_user(db: Session, user_in: UserCreate):
     if get_user_by_email(db, user_in.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     if get_user_by_phone(db,user_in.phone_number):
         raise HTTPException(status_code=400, detail="Phone number already registered")
     if get_user_by_username(db,user_in.username):
         raise HTTPException(status_code=400, detail="Username already registered")
+
+
+def _create_user_with_session(db: Session, user_in: UserCreate, hashed_password: str) -> UserWithToken:
     user = create_user(
         db,
-        user_in
+        user_in,
+        hashed_password
     )
     token = create_access_token(data={"sub": user.email,"user_id":user.id})
     create_active_session(db=db,user_id=user.id,token=token)
 
-    return {"user": user, "token": token}
+    # Serialized here: the commit expired the user, and reloading it on the event loop would block
+    return UserWithToken(user=UserOut.model_validate(user), token=token)
 
 
+@router.post("/register", response_model=UserWithToken)
+async def register(user_in: UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_new_user, db, user_in)
+    hashed_password = await hash_password_async(user_in.password)
+    return await run_in_threadpool(_create_user_with_session, db, user_in, hashed_password)
 
-@router.post("/login", response_model=Token)
-def login_user(user: UserLogin, db: Session = Depends(get_db)):
-    # Retrieve user from DB using email or username
-    db_user = get_user_by_username(db, user.username)
-
-    if db_user is None:
-        raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    # Verify password
-    if not verify_password(user.password, db_user.hashed_password):
-        raise HTTPException(status_code=400, detail="Invalid credentials")
+def _login_session(db: Session, db_user) -> Token:
     session=get_active_session_by_user_id(db, db_user.id)
     # Check if session exists and if the token is still valid
     expiration = session.token_expiration_timestamp if session else None
@@ -48,20 +51,26 @@ def login_user(user: UserLogin, db: Session = Depends(get_db)):
         expiration = expiration.replace(tzinfo=timezone.utc)
     if session and expiration > datetime.now(timezone.utc):
         update_active_session(db,db_user.id,session.token)
-        return {
-            "access_token": session.token,
-            "token_type": "bearer",
-            "user": db_user
-        }
+        return Token(access_token=session.token, token_type="bearer", user=UserOut.model_validate(db_user))
 
     # If session is invalid or doesn't exist, create a new access token
     access_token = create_access_token(data={"sub": db_user.email, "user_id": db_user.id})
     update_active_session(db=db, user_id=db_user.id, new_token=access_token)
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": db_user
-    }
+    return Token(access_token=access_token, token_type="bearer", user=UserOut.model_validate(db_user))
+
+
+@router.post("/login", response_model=Token)
+async def login_user(user: UserLogin, db: Session = Depends(get_db)):
+    # Retrieve user from DB using email or username
+    db_user = await run_in_threadpool(get_user_by_username, db, user.username)
+
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    # Verify password
+    if not await verify_password_async(user.password, db_user.hashed_password):
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    return await run_in_threadpool(_login_session, db, db_user)
 
 @router.post("/refresh")
 def refresh(request:Request, db: Session = Depends(get_db)):
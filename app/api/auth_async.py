@@ -0,0 +1,76 @@
+# Async variants of the routes in auth.py, served when DB_MODE=async.
+# Password hashing is awaited on the password pool, so the event loop never runs bcrypt.
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+from app.core.security import create_access_token, hash_password_async, verify_password_async
+from app.db.session import get_async_db
+from app.repositories.auth import aio as auth_repo
+from app.schemas.api.user import UserCreate, UserWithToken, Token, UserLogin, LogoutUserResponse
+
+router = APIRouter()
+
+
+@router.post("/register", response_model=UserWithToken)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if await auth_repo.get_user_by_email(db, user_in.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    if await auth_repo.get_user_by_phone(db, user_in.phone_number):
+        raise HTTPException(status_code=400, detail="Phone number already registered")
+    if await auth_repo.get_user_by_username(db, user_in.username):
+        raise HTTPException(status_code=400, detail="Username already registered")
+    hashed_password = await hash_password_async(user_in.password)
+    user = await auth_repo.create_user(db, user_in, hashed_password)
+    token = create_access_token(data={"sub": user.email, "user_id": user.id})
+    await auth_repo.create_active_session(db, user_id=user.id, token=token)
+
+    return {"user": user, "token": token}
+
+
+@router.post("/login", response_model=Token)
+async def login_user(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    db_user = await auth_repo.get_user_by_username(db, user.username)
+
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    if not await verify_password_async(user.password, db_user.hashed_password):
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    session = await auth_repo.get_active_session_by_user_id(db, db_user.id)
+    # Check if session exists and if the token is still valid
+    expiration = session.token_expiration_timestamp if session else None
+    if expiration and expiration.tzinfo is None:
+        expiration = expiration.replace(tzinfo=timezone.utc)
+    if session and expiration > datetime.now(timezone.utc):
+        await auth_repo.update_active_session(db, db_user.id, session.token)
+        return {"access_token": session.token, "token_type": "bearer", "user": db_user}
+
+    # If session is invalid or doesn't exist, create a new access token
+    access_token = create_access_token(data={"sub": db_user.email, "user_id": db_user.id})
+    await auth_repo.update_active_session(db, user_id=db_user.id, new_token=access_token)
+    return {"access_token": access_token, "token_type": "bearer", "user": db_user}
+
+
+@router.post("/refresh")
+async def refresh(request: Request, db: AsyncSession = Depends(get_async_db)):
+    user_id = request.state.user_id
+
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    await auth_repo.update_active_session(db, user_id=user_id)
+    return {"success": True}
+
+
+@router.post("/logout", response_model=LogoutUserResponse)
+async def logout(request: Request, db: AsyncSession = Depends(get_async_db)):
+    user_id = request.state.user_id
+
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    await auth_repo.delete_active_session(db, user_id=user_id)
+    return LogoutUserResponse(success=True)
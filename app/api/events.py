@@ -1,25 +1,36 @@
 from typing import List
 
 from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi import Request
+from fastapi import Request, Response, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.kafka_config import send_notification
 from app.db.session import get_db
-from app.repositories.auth import are_all_user_ids_present
-from app.repositories.event import get_access_by_user_and_event, get_event_by_event_id, get_event_info_by_id, \
-    get_filtered_events_paginated, get_accesses_by_event, get_recurrence_by_event_id
+from app.repositories.event import get_access_by_user_and_event, \
+    get_filtered_events_paginated, get_accesses_by_event, get_event_cache_tag
+from app.repositories.event.change_log import get_version_change_id
 from app.schemas.api.events import EventCreate, EventResponse, EventResponseWithAccess, ShareEventPayload, \
     ShareEventResponse, EventFilterResponse, EventFilterRequest, EventUpdatePayload, BatchEventCreate, \
     PermissionResponse, EventVersionResponse, EventChangelogResponse
 from app.services.events import update_event_details_service, delete_event_by_id, delete_event_permission, \
-    rollback_event_to_version_service, reconstruct_event_version, get_difference, populate_change_log
-from app.services.events.event_service import create_event_service, share_event_service,get_event_changelog
+    rollback_event_to_version_service
+from app.services.events.event_service import create_event_service, share_event_service,get_event_changelog, \
+    create_events_batch_service, get_event_service, event_tag, get_event_version_service, get_difference_service, \
+    stream_event_timeline, stream_event_changelog
 from app.services.events.validations import validate_event_times, validate_recurrence
-from app.utils import AccessLevel, map_to_event_version_response, RecurrencePattern
+from app.utils import AccessLevel, map_to_event_version_response, make_etag, etag_matches
 
 router = APIRouter()
 
+# Clients may keep responses but must revalidate them with If-None-Match
+REVALIDATE = "private, no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
 @router.post("", response_model=EventFilterResponse, status_code=status.HTTP_200_OK)
 def filter_events(
     filters: EventFilterRequest,
@@ -48,8 +59,8 @@ def create_event(payload: EventCreate, db: Session = Depends(get_db), request: R
         title=event_info.title,
         description=event_info.description,
         location=event_info.location,
-        start_time=event.start_time,
-        end_time=event.end_time
+        start_time=event.start_time.replace(tzinfo=None),  # as stored, the async session keeps the payload value
+        end_time=event.end_time.replace(tzinfo=None)
     )
 
 
@@ -60,63 +71,35 @@ def create_events_batch(
     request: Request = None
 ):
     user_id = request.state.user_id
-    responses = []
-    for event_payload in payload.events:                #Looping 2 times, first time to ensure valid data.
+    for event_payload in payload.events:                # Validate the whole batch before inserting anything
         validate_event_times(event_payload)                 # Handling it here instead of service layer
         if event_payload.is_recurring:                              #to reuse functions
             validate_recurrence(event_payload)
 
-    for event_payload in payload.events:
-        event_info, event = create_event_service(event_payload, db, user_id=user_id)
-
-        responses.append(EventResponse(
-            id=event_info.id,
-            title=event_info.title,
-            description=event_info.description,
-            location=event_info.location,
-            start_time=event.start_time,
-            end_time=event.end_time
-        ))
-
-    return responses
+    return create_events_batch_service(payload.events, db, user_id=user_id)
 
 #only returns latest event instance
 @router.get("/{id}", response_model=EventResponseWithAccess)
-def get_event(id: int, request: Request, db: Session = Depends(get_db)):
+def get_event(id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     user_id = request.state.user_id  # Extracted from middleware
 
-    # Check if user has access to this event
-    access_entry = get_access_by_user_and_event(db, user_id=user_id, event_id=id)
-    if not access_entry:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to view this event."
-        )
+    # Revalidation only needs the tag probe, the event is not loaded or serialized on a match
+    probe = None
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        probe = get_event_cache_tag(db, user_id, id)
+        if not probe:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You do not have permission to view this event."
+            )
+        etag = make_etag(id, *event_tag(probe), probe.access)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
 
-    event_info, event ,recurrence =get_event_info_by_id(db,id), get_event_by_event_id(db, id),get_recurrence_by_event_id(db, id)
-    if not event_info or not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found."
-        )
-
-    return EventResponseWithAccess(
-        id=event_info.id,
-        title=event_info.title,
-        description=event_info.description,
-        location=event_info.location,
-        start_time=event.start_time,
-        end_time=event.end_time,
-        access=access_entry.access,
-        status=event.status,
-        version=event_info.version,
-        recurrence_pattern=RecurrencePattern(
-            hour=recurrence.hour,
-            day=recurrence.day,
-            year=recurrence.year,
-            month=recurrence.month
-        ) if recurrence else None
-    )
+    event, tag = get_event_service(db, user_id=user_id, event_id=id, probe=probe)
+    response.headers.update({"ETag": make_etag(id, *tag, event.access), "Cache-Control": REVALIDATE})
+    return event
 
 
 
@@ -133,7 +116,13 @@ request: Request,
     """
     Update the details of an event (e.g., title, time, recurrence).
     """
-    user_id = request.state.user_id
+    apply_event_update(db, request.state.user_id, event_id, payload)
+
+    send_notification("send_notif", {"event_id": event_id})
+    return {"message": "Event updated successfully"}
+
+
+def apply_event_update(db: Session, user_id: int, event_id: int, payload: EventUpdatePayload):
     access = get_access_by_user_and_event(db, user_id, event_id)
     if not access or (access.access not in [AccessLevel.OWNER, AccessLevel.WRITE]):
         raise HTTPException(
@@ -141,13 +130,8 @@ request: Request,
             detail="You do not have permission to edit this event."
         )
 
-    changed_values,version = update_event_details_service(event_id, payload, db)
-    if not changed_values:
-        raise HTTPException(status_code=500, detail="Failed to update event")
-    populate_change_log(db,changed_values,version,event_id)
-    
-    send_notification("send_notif", {"event_id": event_id})
-    return {"message": "Event updated successfully"}
+    # The new version and its change log are committed together
+    update_event_details_service(event_id, payload, db)
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_event(id: int, request:Request ,db: Session = Depends(get_db)):
@@ -158,8 +142,8 @@ def delete_event(id: int, request:Request ,db: Session = Depends(get_db)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the owner can delete this event."
         )
-    success = delete_event_by_id(db=db, event_id=id)
-    if not success:
+    deleted = delete_event_by_id(db=db, event_id=id)
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Event not found or could not be deleted."
@@ -181,19 +165,7 @@ request: Request,
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the owner can share this event. If owner, please check existence of the event"
         )
-    if not are_all_user_ids_present(db,[user.user_id for user in payload.users]):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid User_ID provided. Please check again"
-        )
-    for user in payload.users:
-        if user.user_id == user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You cannot share this event with yourself."
-            )
-    # Input validations can go here if needed
-    return ShareEventResponse(users=share_event_service(db, id, payload))
+    return ShareEventResponse(users=share_event_service(db, id, payload, owner_id=user_id))
 
 @router.get("/{id}/permissions", response_model=List[PermissionResponse])
 def list_event_permissions(id: int, db: Session = Depends(get_db), request: Request = None):
@@ -224,17 +196,56 @@ def remove_event_permission(id: int, user_id: int, db: Session = Depends(get_db)
     return  # 204 No Content
 
 @router.get("/{event_id}/history/{version_id}", response_model=EventVersionResponse)
-def get_event_at_version(event_id: int, version_id: int,request:Request, db: Session = Depends(get_db)):
+def get_event_at_version(event_id: int, version_id: int,request:Request, response: Response, db: Session = Depends(get_db)):
     user_id = request.state.user_id
-    access = get_access_by_user_and_event(db, user_id, event_id)
+    probe = get_event_cache_tag(db, user_id, event_id)
 
-    if not access:
+    if not probe:
         raise HTTPException(status_code=403, detail="You do not have permission to view history of this event.")
 
-    event_dict = reconstruct_event_version(db, event_id, version_id)
+    # A version that does not exist yet has no change rows to tag it by
+    if not 1 <= version_id <= probe.version:
+        raise HTTPException(status_code=400, detail="Invalid version.")
+
+    # Tagged by the version's own change rows, so later updates leave it alone. A rollback rewrites them and
+    # compaction re-encodes them, so the version is revalidated rather than cached as immutable
+    etag = make_etag(event_id, version_id, *get_version_change_id(db, event_id, version_id))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    event_dict = get_event_version_service(db, event_id, version_id, current_version=probe.version)
+    response.headers.update({"ETag": etag, "Cache-Control": REVALIDATE})
     return map_to_event_version_response(event_dict)
 
 
+@router.get("/{event_id}/timeline")
+def get_event_timeline(
+    event_id: int,
+    request: Request,
+    from_version: int = Query(1, alias="from", ge=1),
+    to_version: int | None = Query(None, alias="to", ge=1),
+    db: Session = Depends(get_db),
+):
+    to_version = check_timeline_range(db, request.state.user_id, event_id, from_version, to_version)
+    # One JSON object per version, written as the change log is replayed
+    return StreamingResponse(
+        stream_event_timeline(event_id, from_version, to_version), media_type="application/x-ndjson"
+    )
+
+
+def check_timeline_range(db: Session, user_id: int, event_id: int, from_version: int, to_version: int | None) -> int:
+    """Returns the last version of the timeline, checking access and the requested range."""
+    probe = get_event_cache_tag(db, user_id, event_id)
+
+    if not probe:
+        raise HTTPException(status_code=403, detail="You do not have permission to view history of this event.")
+
+    to_version = probe.version if to_version is None else to_version
+    if from_version > to_version or to_version > probe.version:
+        raise HTTPException(status_code=400, detail="Invalid version range.")
+    return to_version
+
+
 @router.post("/{event_id}/rollback/{version_id}", status_code=200)
 def rollback_event(
     event_id: int,
@@ -248,29 +259,60 @@ def rollback_event(
     if not access or access.access == AccessLevel.READ:
         raise HTTPException(status_code=403, detail="You do not have permission to rollback this event.")
 
-    event_info_obj = get_event_info_by_id(db, event_id)
-    if version_id >= event_info_obj.version:
-        raise HTTPException(status_code=400, detail="Cannot rollback to current or future version")
-
     try:
-        rollback_event_to_version_service(db, event_id, version_id, event_info_obj.version)
+        # The service checks version_id against the locked row, so a concurrent update is rolled back too
+        rollback_event_to_version_service(db, event_id, version_id)
         return {"detail": f"Rolled back to version {version_id}"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{id}/changelog", response_model=EventChangelogResponse, status_code=200)
-def get_event_changelog_route(id: int,request: Request, db: Session = Depends(get_db), ):
+def get_event_changelog_route(
+    id: int,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
     user_id = request.state.user_id
-    access = get_access_by_user_and_event(db, user_id, id)
+    probe = get_event_cache_tag(db, user_id, id)
 
-    if not access:
+    if not probe:
         raise HTTPException(status_code=403, detail="You do not have permission to view changelogs of this event.")
 
-    result = get_event_changelog(db, id)
-    if not result.changelog:
+    # Change logs are only appended or truncated from a version onwards, the newest id of each format
+    # identifies the set
+    has_changes = probe.last_change_id is not None or probe.last_change_set_id is not None
+    etag = make_etag(id, probe.last_change_id, probe.last_change_set_id, cursor, limit)
+    if has_changes and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    result = get_event_changelog(db, id, probe.version, cursor=cursor, limit=limit)
+    if not result.changelog and cursor is None and result.next_cursor is None:
         raise HTTPException(status_code=404, detail="No changelog found for event.")
+    response.headers.update({"ETag": etag, "Cache-Control": REVALIDATE})
     return result
 
+
+@router.get("/{id}/changelog/stream")
+def stream_event_changelog_route(id: int, request: Request, db: Session = Depends(get_db)):
+    to_version = check_changelog_stream(db, request.state.user_id, id)
+    return StreamingResponse(stream_event_changelog(id, to_version), media_type="application/x-ndjson")
+
+
+def check_changelog_stream(db: Session, user_id: int, event_id: int) -> int:
+    """Returns the event's current version, checking access and that it has a change log."""
+    probe = get_event_cache_tag(db, user_id, event_id)
+
+    if not probe:
+        raise HTTPException(status_code=403, detail="You do not have permission to view changelogs of this event.")
+    if probe.last_change_id is None and probe.last_change_set_id is None:
+        raise HTTPException(status_code=404, detail="No changelog found for event.")
+    return probe.version
+
 @router.get("/events/{event_id}/diff/{version1}/{version2}")
 def get_event_version_diff(
 request: Request,
@@ -280,16 +322,16 @@ request: Request,
     db: Session = Depends(get_db),
 ):
     user_id = request.state.user_id
-    access = get_access_by_user_and_event(db, user_id, event_id)
+    probe = get_event_cache_tag(db, user_id, event_id)
 
-    if not access:
+    if not probe:
         raise HTTPException(status_code=403, detail="You do not have permission to view changelogs of this event.")
 
     if version1 >= version2:
         raise HTTPException(status_code=400, detail="version1 must be less than version2")
 
     try:
-        diff = get_difference(db, event_id, version1, version2)
+        diff = get_difference_service(db, event_id, version1, version2, current_version=probe.version)
         return diff
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
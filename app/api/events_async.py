@@ -0,0 +1,139 @@
+# Async variants of the routes in events.py, served when DB_MODE=async.
+# Each route runs the same handler on the request's AsyncSession through run_sync, so all queries
+# go through the async driver on the event loop instead of occupying a threadpool worker. The handlers'
+# Redis calls go through run_blocking, which awaits them on a worker thread from inside run_sync.
+# The NDJSON streams only run their checks that way; the body is read by an async generator on its own
+# AsyncSession, as the request's session is closed before the body is sent.
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, status, Depends
+from fastapi import Request, Response, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import events
+from app.core.kafka_config import send_notification
+from app.db.session import get_async_db
+from app.schemas.api.events import EventCreate, EventResponse, EventResponseWithAccess, ShareEventPayload, \
+    ShareEventResponse, EventFilterResponse, EventFilterRequest, EventUpdatePayload, BatchEventCreate, \
+    PermissionResponse, EventVersionResponse, EventChangelogResponse
+from app.services.events.event_service import stream_event_timeline_async, stream_event_changelog_async
+
+router = APIRouter()
+
+
+@router.post("", response_model=EventFilterResponse, status_code=status.HTTP_200_OK)
+async def filter_events(filters: EventFilterRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: events.filter_events(filters=filters, request=request, db=session))
+
+
+@router.post("/create", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
+async def create_event(payload: EventCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: events.create_event(payload=payload, db=session, request=request))
+
+
+@router.post("/batch", response_model=List[EventResponse], status_code=status.HTTP_201_CREATED)
+async def create_events_batch(payload: BatchEventCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: events.create_events_batch(payload=payload, db=session, request=request))
+
+
+@router.get("/{id}", response_model=EventResponseWithAccess)
+async def get_event(id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: events.get_event(id=id, request=request, response=response, db=session))
+
+
+@router.put("/{event_id}", summary="Update event details")
+async def update_event(
+    event_id: int, payload: EventUpdatePayload, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    await db.run_sync(events.apply_event_update, request.state.user_id, event_id, payload)
+
+    # The Kafka producer blocks until the broker acks, keep it off the event loop
+    await asyncio.to_thread(send_notification, "send_notif", {"event_id": event_id})
+    return {"message": "Event updated successfully"}
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_event(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    await db.run_sync(lambda session: events.delete_event(id=id, request=request, db=session))
+
+
+@router.put("/{id}/share", response_model=ShareEventResponse, status_code=status.HTTP_200_OK)
+async def share_event(id: int, request: Request, payload: ShareEventPayload, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: events.share_event(id=id, request=request, payload=payload, db=session))
+
+
+@router.get("/{id}/permissions", response_model=List[PermissionResponse])
+async def list_event_permissions(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda session: events.list_event_permissions(id=id, db=session, request=request))
+
+
+@router.delete("/{id}/permissions/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_event_permission(id: int, user_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    await db.run_sync(
+        lambda session: events.remove_event_permission(id=id, user_id=user_id, db=session, request=request)
+    )
+
+
+@router.get("/{event_id}/history/{version_id}", response_model=EventVersionResponse)
+async def get_event_at_version(
+    event_id: int, version_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(lambda session: events.get_event_at_version(
+        event_id=event_id, version_id=version_id, request=request, response=response, db=session
+    ))
+
+
+@router.get("/{event_id}/timeline")
+async def get_event_timeline(
+    event_id: int,
+    request: Request,
+    from_version: int = Query(1, alias="from", ge=1),
+    to_version: int | None = Query(None, alias="to", ge=1),
+    db: AsyncSession = Depends(get_async_db),
+):
+    to_version = await db.run_sync(
+        events.check_timeline_range, request.state.user_id, event_id, from_version, to_version
+    )
+    return StreamingResponse(
+        stream_event_timeline_async(event_id, from_version, to_version), media_type="application/x-ndjson"
+    )
+
+
+@router.post("/{event_id}/rollback/{version_id}", status_code=200)
+async def rollback_event(event_id: int, version_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(
+        lambda session: events.rollback_event(event_id=event_id, version_id=version_id, request=request, db=session)
+    )
+
+
+@router.get("/{id}/changelog", response_model=EventChangelogResponse, status_code=200)
+async def get_event_changelog_route(
+    id: int,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(lambda session: events.get_event_changelog_route(
+        id=id, request=request, response=response, cursor=cursor, limit=limit, db=session
+    ))
+
+
+@router.get("/{id}/changelog/stream")
+async def stream_event_changelog_route(id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    to_version = await db.run_sync(events.check_changelog_stream, request.state.user_id, id)
+    return StreamingResponse(stream_event_changelog_async(id, to_version), media_type="application/x-ndjson")
+
+
+@router.get("/events/{event_id}/diff/{version1}/{version2}")
+async def get_event_version_diff(
+    request: Request, event_id: int, version1: int, version2: int, db: AsyncSession = Depends(get_async_db)
+):
+    return await db.run_sync(
+        lambda session: events.get_event_version_diff(
+            request=request, event_id=event_id, version1=version1, version2=version2, db=session
+        )
+    )
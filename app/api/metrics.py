@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from app.core.event_cache import get_event_cache_stats
+from app.core.event_queue import event_wheel
+from app.core.history_cache import history_cache
+from app.core.scheduler_metrics import get_scheduler_stats, get_dispatch_lag_stats
+from app.core.security import get_password_pool_stats
+from app.core.session_cache import get_session_cache_stats
+
+router = APIRouter()
+
+
+@router.get("")
+def get_metrics():
+    """In-process counters for this worker."""
+    return {
+        "session_cache": get_session_cache_stats(),
+        "event_cache": get_event_cache_stats(),
+        "history_cache": history_cache.stats(),
+        "password_pool": get_password_pool_stats(),
+        "scheduler": get_scheduler_stats(),
+        "dispatch_lag": get_dispatch_lag_stats(),
+        "timing_wheel": event_wheel.stats(),
+    }
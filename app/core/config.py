@@ -1,11 +1,13 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import redis
+import redis.asyncio
 from dotenv import load_dotenv
 import os
 
 class DBSettings(BaseSettings):
     driver: str = Field(..., alias="DATABASE_DRIVER")
+    async_driver: str = Field("mysql+aiomysql", alias="DATABASE_ASYNC_DRIVER")
     server: str = Field(..., alias="DATABASE_SERVER")
     database: str = Field(..., alias="DATABASE_NAME")
     username: str = Field(..., alias="DATABASE_USERNAME")
@@ -19,6 +21,13 @@ class DBSettings(BaseSettings):
         f"@{self.server}:{self.port}/{self.database}"
     )
 
+    @property
+    def async_database_url(self):
+        return (
+        f"{self.async_driver}://{self.username}:{self.password}"
+        f"@{self.server}:{self.port}/{self.database}"
+    )
+
     class Config:
         env_file = "app/.env"
         extra = "ignore"
@@ -32,8 +41,53 @@ redis_db = int(os.getenv("REDIS_DB", 0))
 
 # Initialize Redis client
 redis_client = redis.Redis(host=redis_host, port=redis_port, db=redis_db)
+# Used from coroutines running on the event loop (scheduler jobs)
+async_redis_client = redis.asyncio.Redis(host=redis_host, port=redis_port, db=redis_db)
 
 REDIS_EVENTS_ZSET="events_cache"
+# Progress of the incremental scraper: end of the window already scheduled and when it last read changes
+REDIS_SCRAPER_WATERMARK = "events_cache:watermark"
+# How far ahead occurrences are put into REDIS_EVENTS_ZSET
+SCRAPER_WINDOW_MINUTES = int(os.getenv("SCRAPER_WINDOW_MINUTES", 10))
+# Changes are re-read this far behind the watermark, for updates still committing during the previous tick
+SCRAPER_WATERMARK_OVERLAP_SECONDS = int(os.getenv("SCRAPER_WATERMARK_OVERLAP_SECONDS", 5))
+# Members per ZADD/ZREM command; all chunks of a run still go out in one pipeline
+REDIS_PIPELINE_CHUNK_SIZE = int(os.getenv("REDIS_PIPELINE_CHUNK_SIZE", 1000))
+# Due members a poller claims per atomic step; it keeps claiming until fewer come back
+POLLER_CLAIM_BATCH_SIZE = int(os.getenv("POLLER_CLAIM_BATCH_SIZE", 500))
+# Dispatch due members from a long-running task that sleeps until the next one is due, instead of polling
+# every minute. The scraper pushes to REDIS_DISPATCHER_WAKEUP when it schedules something, which ends the sleep.
+EVENT_DISPATCHER = os.getenv("EVENT_DISPATCHER", "true").lower() == "true"
+REDIS_DISPATCHER_WAKEUP = "events_cache:wakeup"
+# Upper bound on one sleep, so members added without a wake-up are still picked up
+DISPATCHER_MAX_SLEEP_SECONDS = float(os.getenv("DISPATCHER_MAX_SLEEP_SECONDS", 5))
+# Keep this worker's next SCRAPER_WINDOW_MINUTES of triggers in an in-process timing wheel, so the dispatcher
+# only goes to Redis to claim what fires; the sorted set stays the durable copy and is still swept for due members
+# every DISPATCHER_MAX_SLEEP_SECONDS
+EVENT_TIMING_WHEEL = os.getenv("EVENT_TIMING_WHEEL", "true").lower() == "true"
+TIMING_WHEEL_TICK_SECONDS = float(os.getenv("TIMING_WHEEL_TICK_SECONDS", 0.01))
+
+# Where active sessions are kept: "sql" (active_sessions table) or "redis" (keys with native TTL)
+SESSION_STORE = os.getenv("SESSION_STORE", "sql")
+# With the redis store, also persist logins/logouts to active_sessions as a durable fallback
+SESSION_STORE_SQL_FALLBACK = os.getenv("SESSION_STORE_SQL_FALLBACK", "false").lower() == "true"
+# Sliding refreshes also move the fallback row's expiry, at most once per user per this many seconds
+SESSION_STORE_SQL_FALLBACK_REFRESH_SECONDS = float(os.getenv("SESSION_STORE_SQL_FALLBACK_REFRESH_SECONDS", 300))
+# Request path data access: "sync" (threadpool routes on the sync engine) or "async" (async routes on AsyncSession)
+DB_MODE = os.getenv("DB_MODE", "sync")
+# Rows per multi-row INSERT (and per transaction) on the batch event creation path
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", 500))
+# Event filter totals: how long count_mode="cached" reuses a count, and where count_mode="estimate" stops counting
+EVENT_COUNT_CACHE_TTL_SECONDS = float(os.getenv("EVENT_COUNT_CACHE_TTL_SECONDS", 30))
+EVENT_COUNT_ESTIMATE_CAP = int(os.getenv("EVENT_COUNT_ESTIMATE_CAP", 1000))
+# A full event snapshot is stored every N versions, so reconstructing a version replays at most N change sets
+EVENT_SNAPSHOT_INTERVAL = int(os.getenv("EVENT_SNAPSHOT_INTERVAL", 50))
+# Attempts an event update gets when a concurrent writer bumped the version first, then 409
+EVENT_UPDATE_MAX_ATTEMPTS = int(os.getenv("EVENT_UPDATE_MAX_ATTEMPTS", 3))
+# "rows": one change_log row per changed field. "compact": one change_set row per version.
+# Readers accept both, so existing history keeps working; compact it with app.services.cron.compact_change_logs
+CHANGE_LOG_FORMAT = os.getenv("CHANGE_LOG_FORMAT", "rows")
+
 # Instantiate DBSettings
 db_settings = DBSettings()
 
@@ -0,0 +1,29 @@
+import os
+
+from app.utils.cache import TTLCache
+
+EVENT_CACHE_SIZE = int(os.getenv("EVENT_CACHE_SIZE", 10000))
+EVENT_CACHE_TTL_SECONDS = float(os.getenv("EVENT_CACHE_TTL_SECONDS", 300))
+
+# event_id -> (tag, assembled event response). The tag is (version, occurrence id, status, last change_log id,
+# last change_set id), so an entry is only served while the event is unchanged, including writes made by other
+# workers.
+event_cache = TTLCache(maxsize=EVENT_CACHE_SIZE, ttl=EVENT_CACHE_TTL_SECONDS)
+
+
+def get_cached_event(event_id: int) -> tuple | None:
+    """Returns (tag, response); the caller serves it only if the tag still matches the database."""
+    return event_cache.get(event_id)
+
+
+def cache_event(event_id: int, tag: tuple, response):
+    event_cache.set(event_id, (tag, response))
+
+
+def invalidate_cached_event(event_id: int):
+    """Evict the event after a write. Staleness is caught by the tag anyway, this frees the entry early."""
+    event_cache.pop(event_id)
+
+
+def get_event_cache_stats() -> dict:
+    return event_cache.stats()
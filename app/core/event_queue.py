@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from app.core.config import async_redis_client, REDIS_EVENTS_ZSET, TIMING_WHEEL_TICK_SECONDS
+from app.utils.timing_wheel import TimingWheel
+
+# Pops up to ARGV[2] members due by ARGV[1] in one atomic step, so each member goes to exactly one poller.
+# The batch bound keeps the script short (Redis blocks while it runs) and within Lua's unpack limit.
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+local members = {}
+for i = 1, #due, 2 do
+    members[#members + 1] = due[i]
+end
+if #members > 0 then
+    redis.call('ZREM', KEYS[1], unpack(members))
+end
+return due
+"""
+
+# Removes those of the members ARGV[2..] that are due by ARGV[1], returning them with their scores, i.e. the
+# ones this caller claimed. A member rescheduled to a later time stays put for the sweep or the next wheel load.
+CLAIM_MEMBERS_SCRIPT = """
+local claimed = {}
+local now = tonumber(ARGV[1])
+for i = 2, #ARGV do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if score and tonumber(score) <= now then
+        redis.call('ZREM', KEYS[1], ARGV[i])
+        claimed[#claimed + 1] = ARGV[i]
+        claimed[#claimed + 1] = score
+    end
+end
+return claimed
+"""
+
+_claim_due = async_redis_client.register_script(CLAIM_DUE_SCRIPT)
+_claim_members = async_redis_client.register_script(CLAIM_MEMBERS_SCRIPT)
+
+# Near-term members of this worker, loaded by its scraper and fired by its dispatcher; only used from the
+# event loop. Set whenever the wheel gets new members, so a sleeping dispatcher re-plans its sleep.
+event_wheel = TimingWheel(tick=TIMING_WHEEL_TICK_SECONDS, now=time.time())
+wheel_changed = asyncio.Event()
+
+
+async def claim_due_members(now: float, limit: int, client=None) -> list[tuple[bytes, float]]:
+    """
+    Claims up to limit members of REDIS_EVENTS_ZSET scored at or before now, lowest score first.
+    Returns (member, score) pairs; the score is the time the member was due.
+    """
+    script = _claim_due if client is None else client.register_script(CLAIM_DUE_SCRIPT)
+    due = await script(keys=[REDIS_EVENTS_ZSET], args=[now, limit])
+    return [(member, float(score)) for member, score in zip(due[::2], due[1::2])]
+
+
+async def claim_members(members: list[str], now: float, client=None) -> list[tuple[bytes, float]]:
+    """
+    Claims those of the given members of REDIS_EVENTS_ZSET that are due by now, in one atomic step.
+    A member another worker claimed first, that was unscheduled or that was moved past now meanwhile is
+    left out of the result. Returns (member, score) pairs; the score is the time the member was due.
+    """
+    script = _claim_members if client is None else client.register_script(CLAIM_MEMBERS_SCRIPT)
+    claimed = await script(keys=[REDIS_EVENTS_ZSET], args=[now, *members])
+    return [(member, float(score)) for member, score in zip(claimed[::2], claimed[1::2])]
+
+
+def load_wheel(to_add: dict, to_remove) -> int:
+    """Mirrors a scraper run into the wheel. Returns how many members fell beyond the wheel's horizon."""
+    for member in to_remove:
+        event_wheel.cancel(member)
+    rejected = sum(not event_wheel.schedule(member, score) for member, score in to_add.items())
+    if to_add:
+        wheel_changed.set()
+    return rejected
+
+
+async def load_wheel_from_redis(until: float) -> int:
+    """Fills the wheel with the members of REDIS_EVENTS_ZSET due by until, as after a restart. Returns the count."""
+    members = await async_redis_client.zrangebyscore(REDIS_EVENTS_ZSET, "-inf", until, withscores=True)
+    load_wheel({member.decode(): score for member, score in members}, ())
+    return len(members)
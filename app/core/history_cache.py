@@ -0,0 +1,141 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from app.core.config import redis_client
+from app.utils.cache import TTLCache
+from app.utils.concurrency import run_blocking
+
+logger = logging.getLogger(__name__)
+
+HISTORY_CACHE_EVENTS = int(os.getenv("HISTORY_CACHE_EVENTS", 1000))
+HISTORY_CACHE_ENTRIES_PER_EVENT = int(os.getenv("HISTORY_CACHE_ENTRIES_PER_EVENT", 256))
+HISTORY_CACHE_TTL_SECONDS = float(os.getenv("HISTORY_CACHE_TTL_SECONDS", 3600))
+# Share reconstructed versions and diffs between workers through a Redis hash per event
+HISTORY_CACHE_REDIS = os.getenv("HISTORY_CACHE_REDIS", "false").lower() == "true"
+
+
+class HistoryCache:
+    """
+    Reconstructed versions and diffs of past versions, per event. Keys are tuples whose last element is the
+    newest version the value depends on: ("version", v) or ("diff", v1, v2).
+
+    Every value is stored with a token, the (change_log, change_set) ids of that version. A rollback
+    followed by new updates rewrites a version with new change_log rows or a new change set, so a value is
+    only served while the caller's token matches, wherever the rollback ran. Invalidation drops the affected
+    keys early.
+    """
+
+    def __init__(self, max_events: int, entries_per_event: int, ttl: float, redis=None):
+        # event_id -> OrderedDict(key -> (token, value)), LRU at both levels
+        self._events = TTLCache(maxsize=max_events, ttl=ttl)
+        self._entries_per_event = entries_per_event
+        self._ttl = ttl
+        self._redis = redis
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _redis_key(event_id: int) -> str:
+        return f"history_cache:{event_id}"
+
+    @staticmethod
+    def _field(key: tuple) -> str:
+        return ":".join(str(part) for part in key)
+
+    def _set_local(self, event_id: int, key: tuple, token, value):
+        with self._lock:
+            entries = self._events.get(event_id)
+            if entries is None:
+                entries = OrderedDict()
+                self._events.set(event_id, entries)
+            entries[key] = (token, value)
+            entries.move_to_end(key)
+            while len(entries) > self._entries_per_event:
+                entries.popitem(last=False)
+
+    def get(self, event_id: int, key: tuple, token):
+        with self._lock:
+            entries = self._events.get(event_id)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None:
+                entries.move_to_end(key)
+            if entry is not None and entry[0] == token:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        if self._redis is not None:
+            try:
+                raw = run_blocking(self._redis.hget, self._redis_key(event_id), self._field(key))
+            except Exception as e:
+                logger.error(f"History cache read failed for event {event_id}: {e}")
+                return None
+            if raw is not None:
+                cached = json.loads(raw)
+                # JSON turns a tuple token into a list
+                if cached["token"] == (list(token) if isinstance(token, tuple) else token):
+                    self._set_local(event_id, key, token, cached["value"])
+                    return cached["value"]
+        return None
+
+    def set(self, event_id: int, key: tuple, token, value):
+        self._set_local(event_id, key, token, value)
+        if self._redis is not None:
+            try:
+                redis_key = self._redis_key(event_id)
+                pipe = self._redis.pipeline()
+                pipe.hset(redis_key, self._field(key), json.dumps({"token": token, "value": value}, default=str))
+                pipe.expire(redis_key, int(self._ttl))
+                run_blocking(pipe.execute)
+            except Exception as e:
+                logger.error(f"History cache write failed for event {event_id}: {e}")
+
+    def invalidate_from_version(self, event_id: int, version_id: int):
+        """Drops every value that depends on version_id or later, as a rollback to version_id - 1 rewrites them."""
+        with self._lock:
+            entries = self._events.get(event_id)
+            if entries is not None:
+                for key in [key for key in entries if key[-1] >= version_id]:
+                    del entries[key]
+        if self._redis is not None:
+            try:
+                run_blocking(self._redis_invalidate_from_version, self._redis_key(event_id), version_id)
+            except Exception as e:
+                logger.error(f"History cache invalidation failed for event {event_id}: {e}")
+
+    def _redis_invalidate_from_version(self, redis_key: str, version_id: int):
+        stale = [
+            field for field in self._redis.hkeys(redis_key)
+            if int(field.decode().rsplit(":", 1)[-1]) >= version_id
+        ]
+        if stale:
+            self._redis.hdel(redis_key, *stale)
+
+    def invalidate_event(self, event_id: int):
+        self._events.pop(event_id)
+        if self._redis is not None:
+            try:
+                run_blocking(self._redis.delete, self._redis_key(event_id))
+            except Exception as e:
+                logger.error(f"History cache invalidation failed for event {event_id}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "events": len(self._events),
+            "max_events": self._events.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis": self._redis is not None,
+        }
+
+
+history_cache = HistoryCache(
+    max_events=HISTORY_CACHE_EVENTS,
+    entries_per_event=HISTORY_CACHE_ENTRIES_PER_EVENT,
+    ttl=HISTORY_CACHE_TTL_SECONDS,
+    redis=redis_client if HISTORY_CACHE_REDIS else None,
+)
@@ -0,0 +1,62 @@
+import threading
+
+# job name -> counters of its Redis traffic in this worker
+_jobs: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def record_tick(job: str, round_trips: int, members: int):
+    """Counts one run of a scheduler job: Redis round-trips made and sorted set members written or claimed."""
+    with _lock:
+        stats = _jobs.setdefault(job, {"ticks": 0, "round_trips": 0, "members": 0, "last_round_trips": 0, "max_round_trips": 0})
+        stats["ticks"] += 1
+        stats["round_trips"] += round_trips
+        stats["members"] += members
+        stats["last_round_trips"] = round_trips
+        stats["max_round_trips"] = max(stats["max_round_trips"], round_trips)
+
+
+def get_scheduler_stats() -> dict:
+    with _lock:
+        return {
+            job: dict(stats, round_trips_per_tick=round(stats["round_trips"] / stats["ticks"], 2))
+            for job, stats in _jobs.items()
+        }
+
+
+# Upper bounds, in seconds, of the dispatch lag buckets: publish time minus the time the member was due
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+_lag_counts = [0] * len(LAG_BUCKETS)
+_lag_total = 0.0
+
+
+def observe_dispatch_lag(seconds: float):
+    global _lag_total
+    with _lock:
+        _lag_counts[next(i for i, bound in enumerate(LAG_BUCKETS) if seconds <= bound)] += 1
+        _lag_total += seconds
+
+
+def _lag_percentile(counts: list[int], total: int, pct: float) -> float | None:
+    """Upper bound of the bucket holding the percentile; None for the open-ended last bucket, as JSON has no inf."""
+    seen = 0
+    for bound, count in zip(LAG_BUCKETS, counts):
+        seen += count
+        if seen >= pct / 100 * total:
+            return None if bound == float("inf") else bound
+    return None
+
+
+def get_dispatch_lag_stats() -> dict:
+    with _lock:
+        counts, lag_total = list(_lag_counts), _lag_total
+    total = sum(counts)
+    if not total:
+        return {"count": 0}
+    return {
+        "count": total,
+        "mean_seconds": round(lag_total / total, 4),
+        "p50_le_seconds": _lag_percentile(counts, total, 50),
+        "p99_le_seconds": _lag_percentile(counts, total, 99),
+        "buckets": {f"le_{bound}": count for bound, count in zip(LAG_BUCKETS, counts)},
+    }
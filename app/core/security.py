@@ -1,3 +1,9 @@
+import asyncio
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
@@ -12,14 +18,104 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "abc")  # Default to localhost:9092
 ALGORITHM = os.getenv("ALGORITHM", "HS256") 
 
-def hash_password(password: str) -> str:
+# bcrypt releases the GIL, so a small thread pool hashes in parallel. It is kept to half the cores
+# so a login storm can't take all the CPU away from the other routes.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+# Requests allowed to wait for a worker before we answer 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 4))
+# Pick the bcrypt cost at startup so one hash takes about this long (0 keeps passlib's default)
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", 0))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+_password_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING)
+_password_stats = {"in_flight": 0, "completed": 0, "rejected": 0}
+_password_stats_lock = threading.Lock()
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(plain, hashed):
+def _verify(plain, hashed) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+def _submit_password_job(fn, *args) -> Future:
+    # Fail fast instead of queueing without bound behind a login storm
+    if not _password_slots.acquire(blocking=False):
+        with _password_stats_lock:
+            _password_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests in progress. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+    with _password_stats_lock:
+        _password_stats["in_flight"] += 1
+    try:
+        future = _password_executor.submit(fn, *args)
+    except Exception:
+        with _password_stats_lock:
+            _password_stats["in_flight"] -= 1
+        _password_slots.release()
+        raise
+    future.add_done_callback(_release_password_slot)
+    return future
+
+
+def _release_password_slot(_future: Future):
+    with _password_stats_lock:
+        _password_stats["in_flight"] -= 1
+        _password_stats["completed"] += 1
+    _password_slots.release()
+
+
+def get_password_pool_stats() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "rounds": pwd_context.handler("bcrypt").default_rounds,
+        **_password_stats,
+    }
+
+
+def hash_password(password: str) -> str:
+    return _submit_password_job(_hash, password).result()
+
+
+def verify_password(plain, hashed):
+    return _submit_password_job(_verify, plain, hashed).result()
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit_password_job(_hash, password))
+
+
+async def verify_password_async(plain, hashed) -> bool:
+    return await asyncio.wrap_future(_submit_password_job(_verify, plain, hashed))
+
+
+def calibrate_bcrypt_rounds(target_ms: float) -> int:
+    """
+    Set the bcrypt cost to the highest value whose hash time stays under target_ms.
+    Each extra round doubles the work, so one timing at a low cost is enough to extrapolate.
+    """
+    probe_rounds = 8
+    probe = CryptContext(schemes=["bcrypt"], bcrypt__rounds=probe_rounds)
+    samples = []
+    for _ in range(3):
+        started = time.perf_counter()
+        probe.hash("calibration")
+        samples.append((time.perf_counter() - started) * 1000)
+
+    rounds = probe_rounds + math.floor(math.log2(target_ms / min(samples)))
+    rounds = max(BCRYPT_MIN_ROUNDS, min(rounds, 31))
+    # Updated in place, so modules that imported pwd_context by name hash with the new cost too
+    pwd_context.update(bcrypt__rounds=rounds)
+    return rounds
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     to_encode["iat"] = int(time.time())  # issued at (current timestamp in seconds)
@@ -0,0 +1,98 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import redis_client
+from app.utils.cache import TTLCache
+from app.utils.concurrency import run_blocking
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", 10000))
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", 60))
+# Leave empty to keep invalidations local to this worker
+SESSION_CACHE_CHANNEL = os.getenv("SESSION_CACHE_CHANNEL", "")
+
+
+@dataclass(frozen=True)
+class CachedSession:
+    user_id: int
+    token: str
+    token_expiration_timestamp: datetime
+
+
+session_cache = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL_SECONDS)
+# Bumped on every invalidation so a lookup that raced with a logout/refresh is not cached
+_generation = 0
+
+
+def get_cached_session(user_id: int) -> CachedSession | None:
+    return session_cache.get(user_id)
+
+
+def get_cache_generation() -> int:
+    return _generation
+
+
+def cache_session(session, generation: int) -> CachedSession:
+    """Cache a session loaded from the store, unless an invalidation happened since `generation` was read."""
+    cached = CachedSession(
+        user_id=session.user_id,
+        token=session.token,
+        token_expiration_timestamp=session.token_expiration_timestamp,
+    )
+    if generation == _generation:
+        session_cache.set(cached.user_id, cached)
+    return cached
+
+
+def invalidate_cached_session(user_id: int, broadcast: bool = True):
+    """Drop the cached session locally and, if configured, tell the other workers to do the same."""
+    global _generation
+    _generation += 1
+    session_cache.pop(user_id)
+    if broadcast and SESSION_CACHE_CHANNEL:
+        try:
+            run_blocking(redis_client.publish, SESSION_CACHE_CHANNEL, str(user_id))
+        except Exception as e:
+            logger.error(f"Failed to broadcast session invalidation for user {user_id}: {e}")
+
+
+def start_session_invalidation_listener():
+    """Subscribe to the invalidation channel in a daemon thread. No-op when no channel is configured."""
+    if not SESSION_CACHE_CHANNEL:
+        return None
+
+    def listener():
+        while True:
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(SESSION_CACHE_CHANNEL)
+                logger.info(f"Listening for session invalidations on '{SESSION_CACHE_CHANNEL}'")
+                for message in pubsub.listen():
+                    try:
+                        invalidate_cached_session(int(message["data"]), broadcast=False)
+                    except (TypeError, ValueError):
+                        logger.warning(f"Ignoring malformed session invalidation: {message['data']!r}")
+            except Exception as e:
+                # We may have missed invalidations while disconnected
+                _clear_cache()
+                logger.error(f"Session invalidation listener failed, reconnecting: {e}")
+                time.sleep(5)
+
+    thread = threading.Thread(target=listener, daemon=True)
+    thread.start()
+    return thread
+
+
+def _clear_cache():
+    global _generation
+    _generation += 1
+    session_cache.clear()
+
+
+def get_session_cache_stats() -> dict:
+    return session_cache.stats()
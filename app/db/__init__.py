@@ -1,8 +1,9 @@
 from app.db.base import Base
 from app.db.session import engine
 
-# Import all models here before create_all
+# Import all models here before the migrations run
 from app.db.models.auth import user
+from app.db.migrations import run_migrations
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    run_migrations(engine)
\ No newline at end of file
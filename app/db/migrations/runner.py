@@ -0,0 +1,49 @@
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Engine
+
+from app.db.migrations import v001_baseline, v002_query_indexes, v003_event_snapshots, v004_change_sets, \
+    v005_events_updated_at
+
+logger = logging.getLogger(__name__)
+
+# Applied in order; append new steps here with the next VERSION
+MIGRATIONS = [v001_baseline, v002_query_indexes, v003_event_snapshots, v004_change_sets, v005_events_updated_at]
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def run_migrations(engine: Engine):
+    """Brings the schema up to the latest version, one transaction per step."""
+    with engine.connect() as lock_conn:
+        # Several workers can start at once; MySQL serialises them on a named lock
+        locked = lock_conn.dialect.name == "mysql"
+        if locked:
+            lock_conn.execute(text("SELECT GET_LOCK('schema_migrations', 300)"))
+        try:
+            with engine.begin() as conn:
+                schema_version.create(conn, checkfirst=True)
+                applied = set(conn.execute(select(schema_version.c.version)).scalars())
+
+            for migration in MIGRATIONS:
+                if migration.VERSION in applied:
+                    continue
+                logger.info(f"Applying schema migration {migration.VERSION}: {migration.DESCRIPTION}")
+                with engine.begin() as conn:
+                    migration.upgrade(conn)
+                    conn.execute(schema_version.insert().values(
+                        version=migration.VERSION,
+                        description=migration.DESCRIPTION,
+                        applied_at=datetime.now(timezone.utc),
+                    ))
+        finally:
+            if locked:
+                lock_conn.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
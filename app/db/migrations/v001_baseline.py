@@ -0,0 +1,89 @@
+"""
+Tables as init_db created them with Base.metadata.create_all before migrations existed. Frozen here rather
+than read from the models, so a new database gets the baseline schema and the later steps bring it forward.
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Enum, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy.dialects.mysql import VARCHAR
+from sqlalchemy.engine import Connection
+
+VERSION = 1
+DESCRIPTION = "baseline schema"
+
+metadata = MetaData()
+
+Table(
+    "users",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String(255), unique=True, index=True, nullable=False),
+    Column("email", String(255), unique=True, nullable=False),
+    Column("hashed_password", String(255), nullable=False),
+    Column("phone_number", String(20), nullable=True),
+)
+
+Table(
+    "active_sessions",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, index=True, nullable=False),
+    Column("token_expiration_timestamp", DateTime, nullable=False),
+    Column("token", VARCHAR(250), nullable=False),
+)
+
+Table(
+    "event_info",
+    metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("title", String(100), nullable=False),
+    Column("description", String(255), nullable=True),
+    Column("location", String(100), nullable=True),
+    Column("version", Integer, nullable=False),
+)
+
+Table(
+    "events",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("event_id", Integer, ForeignKey("event_info.id"), nullable=False),
+    Column("start_time", DateTime, nullable=False),
+    Column("end_time", DateTime, nullable=False),
+    Column("status", Enum("SCHEDULED", "ACTIVE", "CANCELLED", "COMPLETED", name="eventstatus"), nullable=False),
+)
+
+Table(
+    "event_access",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True, nullable=False),
+    Column("event_id", Integer, ForeignKey("event_info.id"), index=True, nullable=False),
+    Column("access", Enum("READ", "WRITE", "OWNER", name="accesslevel"), nullable=False),
+)
+
+Table(
+    "recurrence",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("event_id", Integer, ForeignKey("event_info.id"), unique=True, index=True, nullable=False),
+    Column("hour", Integer, nullable=False),
+    Column("day", Integer, nullable=False),
+    Column("month", Integer, nullable=False),
+    Column("year", Integer, nullable=False),
+    Column("duration", BigInteger, nullable=False),
+)
+
+Table(
+    "change_log",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("event_id", Integer, ForeignKey("event_info.id"), index=True, nullable=False),
+    Column("new_version_id", Integer, nullable=False, index=True),
+    Column("field_name", String(100), nullable=False),
+    Column("old_val", Text),
+    Column("new_val", Text),
+    Column("changed_at", DateTime),
+)
+
+
+def upgrade(conn: Connection):
+    # No-op for tables that already exist, so databases created before migrations adopt version 1 as is
+    metadata.create_all(bind=conn)
@@ -0,0 +1,71 @@
+"""Composite indexes for the hot query shapes, replacing the single-column ones they make redundant."""
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+VERSION = 2
+DESCRIPTION = "composite indexes for event access, events and change_log"
+
+# Frozen here rather than read from the models; the tables exist since v001, so only the indexed columns are declared
+metadata = MetaData()
+
+event_access = Table(
+    "event_access",
+    metadata,
+    Column("user_id", Integer),
+    Column("event_id", Integer),
+)
+
+events = Table(
+    "events",
+    metadata,
+    Column("event_id", Integer),
+    Column("start_time", DateTime),
+    Column("end_time", DateTime),
+    Column("status", Enum("SCHEDULED", "ACTIVE", "CANCELLED", "COMPLETED", name="eventstatus")),
+)
+
+change_log = Table(
+    "change_log",
+    metadata,
+    Column("event_id", Integer),
+    Column("new_version_id", Integer),
+)
+
+NEW_INDEXES = [
+    Index("uq_event_access_user_event", event_access.c.user_id, event_access.c.event_id, unique=True),
+    Index("ix_events_event_id_status", events.c.event_id, events.c.status),
+    Index("ix_events_start_time", events.c.start_time, events.c.end_time, events.c.event_id, events.c.status),
+    Index("ix_change_log_event_version", change_log.c.event_id, change_log.c.new_version_id),
+]
+
+# Prefixes of the composites above; dropped only after the composite exists so foreign keys stay indexed
+REDUNDANT_INDEXES = [
+    ("event_access", "ix_event_access_user_id"),
+    ("change_log", "ix_change_log_event_id"),
+]
+
+
+def _index_names(conn: Connection, table: str) -> set[str]:
+    return {index["name"] for index in inspect(conn).get_indexes(table)}
+
+
+def upgrade(conn: Connection):
+    # Duplicate grants would block the unique index. Which one is right (they may differ in access level)
+    # is not ours to guess, so stop and leave the cleanup to an operator
+    duplicates = conn.execute(text(
+        "SELECT COUNT(*) FROM (SELECT 1 FROM event_access GROUP BY user_id, event_id HAVING COUNT(*) > 1) AS dup"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"event_access has {duplicates} (user_id, event_id) pairs with more than one grant. Keep one row per "
+            "pair, then restart to apply migration 2. To list them: SELECT user_id, event_id, COUNT(*) "
+            "FROM event_access GROUP BY user_id, event_id HAVING COUNT(*) > 1"
+        )
+
+    for index in NEW_INDEXES:
+        if index.name not in _index_names(conn, index.table.name):
+            index.create(conn)
+
+    for table, name in REDUNDANT_INDEXES:
+        if name in _index_names(conn, table):
+            conn.execute(text(f"DROP INDEX {name} ON {table}" if conn.dialect.name == "mysql" else f"DROP INDEX {name}"))
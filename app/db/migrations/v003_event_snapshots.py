@@ -0,0 +1,32 @@
+"""event_snapshot table for snapshot-based version reconstruction."""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+VERSION = 3
+DESCRIPTION = "event_snapshot table"
+
+# Frozen here rather than read from the models; event_info is only declared so the foreign key resolves
+metadata = MetaData()
+
+Table("event_info", metadata, Column("id", Integer, primary_key=True))
+
+event_snapshot = Table(
+    "event_snapshot",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("event_id", Integer, ForeignKey("event_info.id"), nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("title", String(100), nullable=False),
+    Column("description", String(255), nullable=True),
+    Column("location", String(100), nullable=True),
+    Column("recurrence_hour", Integer, nullable=False),
+    Column("recurrence_day", Integer, nullable=False),
+    Column("recurrence_month", Integer, nullable=False),
+    Column("recurrence_year", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("uq_event_snapshot_event_version", "event_id", "version", unique=True),
+)
+
+
+def upgrade(conn: Connection):
+    event_snapshot.create(conn, checkfirst=True)
@@ -0,0 +1,26 @@
+"""change_set table for the compact change log format."""
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, Table, Text
+from sqlalchemy.engine import Connection
+
+VERSION = 4
+DESCRIPTION = "change_set table"
+
+# Frozen here rather than read from the models; event_info is only declared so the foreign key resolves
+metadata = MetaData()
+
+Table("event_info", metadata, Column("id", Integer, primary_key=True))
+
+change_set = Table(
+    "change_set",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("event_id", Integer, ForeignKey("event_info.id"), nullable=False),
+    Column("new_version_id", Integer, nullable=False),
+    Column("changes", Text, nullable=False),
+    Column("changed_at", DateTime, nullable=False),
+    Index("uq_change_set_event_version", "event_id", "new_version_id", unique=True),
+)
+
+
+def upgrade(conn: Connection):
+    change_set.create(conn, checkfirst=True)
@@ -3,4 +3,6 @@ from .events import *
 from .event_info import *
 from .event_access import *
 from .recurrance import *
-from .change_log import *
\ No newline at end of file
+from .change_log import *
+from .event_snapshot import *
+from .change_set import *
\ No newline at end of file
@@ -4,9 +4,12 @@ from app.db.base import Base
 
 class ChangeLog(Base):
     __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_event_version", "event_id", "new_version_id"),
+    )
 
     id = Column(Integer, primary_key=True)
-    event_id = Column(Integer, ForeignKey("event_info.id"), index=True, nullable=False)
+    event_id = Column(Integer, ForeignKey("event_info.id"), nullable=False)
     new_version_id = Column(Integer, nullable=False, index=True)
     field_name = Column(String(100), nullable=False)
     old_val = Column(Text)  # Can store None, Integer, String, or Datetime
@@ -22,7 +25,8 @@ class ChangeLog(Base):
         self.new_val = self._convert_to_str(new_val)
         self.changed_at = datetime.now(timezone.utc)
 
-    def _convert_to_str(self, value):
+    @staticmethod
+    def _convert_to_str(value):
         """
         Helper method to convert values to string for storage.
         Handles None, Integer, String, and Datetime.
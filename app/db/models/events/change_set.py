@@ -0,0 +1,35 @@
+import json
+
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Index
+from datetime import datetime, timezone
+from app.db.base import Base
+from app.db.models.events.change_log import ChangeLog
+
+class ChangeSet(Base):
+    """
+    Compact change log: one row per version with every changed field encoded as
+    {"field": [old_val, new_val], ...} in change order. Written instead of ChangeLog rows when
+    CHANGE_LOG_FORMAT=compact; the change log readers merge both tables.
+    """
+    __tablename__ = "change_set"
+    __table_args__ = (
+        Index("uq_change_set_event_version", "event_id", "new_version_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("event_info.id"), nullable=False)
+    new_version_id = Column(Integer, nullable=False)
+    changes = Column(Text, nullable=False)
+    changed_at = Column(DateTime, nullable=False)
+
+    @staticmethod
+    def encode(changes: dict) -> str:
+        """{field: (old_val, new_val)} -> compact JSON, values stored as ChangeLog stores them."""
+        return json.dumps(
+            {field: [ChangeLog._convert_to_str(old), ChangeLog._convert_to_str(new)] for field, (old, new) in changes.items()},
+            separators=(",", ":"),
+        )
+
+    @staticmethod
+    def decode(raw: str) -> dict:
+        return json.loads(raw)
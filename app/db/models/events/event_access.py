@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Enum,Integer
+from sqlalchemy import Column, ForeignKey, Enum,Integer, Index
 
 from enum import Enum as PyEnum
 import uuid
@@ -8,9 +8,13 @@ from app.utils import AccessLevel
 
 class EventAccess(Base):
     __tablename__ = "event_access"
+    __table_args__ = (
+        # One grant per user and event; also serves every user_id lookup
+        Index("uq_event_access_user_event", "user_id", "event_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"),index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     event_id = Column(Integer, ForeignKey("event_info.id"), index=True,nullable=False)
     access = Column(Enum(AccessLevel), nullable=False, default=AccessLevel.READ)
 
@@ -11,6 +11,9 @@ class EventInfo(Base):
     location = Column(String(100), nullable=True)
     version = Column(Integer,default=1 ,nullable=False)
 
+    # Optimistic lock: updates run "WHERE version = <read version>" and the service sets the new version
+    __mapper_args__ = {"version_id_col": version, "version_id_generator": False}
+
     def __init__(self, title: str, description: str = "", location: str = None):
         self.title = title
         self.description = description
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from datetime import datetime, timezone
+from app.db.base import Base
+
+class EventSnapshot(Base):
+    """Full versioned state of an event, written every EVENT_SNAPSHOT_INTERVAL versions."""
+    __tablename__ = "event_snapshot"
+    __table_args__ = (
+        Index("uq_event_snapshot_event_version", "event_id", "version", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("event_info.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    title = Column(String(100), nullable=False)
+    description = Column(String(255), nullable=True)
+    location = Column(String(100), nullable=True)
+    recurrence_hour = Column(Integer, default=0, nullable=False)
+    recurrence_day = Column(Integer, default=0, nullable=False)
+    recurrence_month = Column(Integer, default=0, nullable=False)
+    recurrence_year = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    def __init__(self, event_id: int, version: int, state: dict):
+        self.event_id = event_id
+        self.version = version
+        self.title = state["title"]
+        self.description = state["description"]
+        self.location = state["location"]
+        self.recurrence_hour = state["recurrence_hour"]
+        self.recurrence_day = state["recurrence_day"]
+        self.recurrence_month = state["recurrence_month"]
+        self.recurrence_year = state["recurrence_year"]
+        self.created_at = datetime.now(timezone.utc)
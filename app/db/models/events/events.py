@@ -1,17 +1,26 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Enum,Integer
-from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Enum,Integer, Index
+from datetime import datetime, timezone
 from app.db.base import Base
 from app.utils import EventStatus
 
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_event_id_status", "event_id", "status"),
+        # Covers the scraper's time-window scan without touching the rows
+        Index("ix_events_start_time", "start_time", "end_time", "event_id", "status"),
+        # The incremental scraper reads the occurrences changed since its watermark
+        Index("ix_events_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True)
     event_id = Column(Integer, ForeignKey("event_info.id"), nullable=False)
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
     status = Column(Enum(EventStatus), nullable=False, default=EventStatus.SCHEDULED)
+    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
 
     def __init__(self, event_id:int, start_time: datetime, end_time: datetime, status: EventStatus = EventStatus.SCHEDULED):
         self.event_id = event_id
@@ -1,6 +1,8 @@
 # app/db/session.py
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
 from app.core.config import db_settings  # Import the db_settings object
 
 
@@ -11,10 +13,32 @@ from app.core.config import db_settings  # Import the db_settings object
 engine = create_engine(db_settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(db_settings.async_database_url)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def get_db(request: Request = None):
+    # Reuse the session the auth middleware already checked out for this request, it closes it
+    middleware_db = getattr(request.state, "db", None) if request is not None else None
+    if middleware_db is not None:
+        yield middleware_db
+        return
 
-def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request = None):
+    middleware_db = getattr(request.state, "async_db", None) if request is not None else None
+    if middleware_db is not None:
+        yield middleware_db
+        return
+
+    db: AsyncSession = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -9,9 +9,13 @@ from starlette.middleware import Middleware
 from app.services.kafka import create_kafka_topics
 from app.services.kafka.start_consumers import start_all_consumers
 from app.db import init_db
-from app.services.cron import scrape_events, poll_redis
+from app.db.session import async_engine
+from app.services.cron import scrape_events, poll_redis, purge_sessions, run_dispatcher
 from app.middleware.middleware import JWTAuthMiddleware, logger
-from app.api import auth,events
+from app.core.security import BCRYPT_TARGET_MS, calibrate_bcrypt_rounds
+from app.core.session_cache import start_session_invalidation_listener
+from app.core.config import DB_MODE, EVENT_DISPATCHER
+from app.api import auth,events,metrics,auth_async,events_async
 # Ensure the scheduler runs in the correct event loop
 scheduler = AsyncIOScheduler(event_loop=asyncio.get_event_loop())
 
@@ -20,6 +24,13 @@ async def lifespan(app: FastAPI):
     # Startup logic
     init_db()  # Initialize your database here
     logger.info("Database initialized.")
+
+    if BCRYPT_TARGET_MS:
+        rounds = calibrate_bcrypt_rounds(BCRYPT_TARGET_MS)
+        logger.info(f"Using bcrypt cost {rounds} for a {BCRYPT_TARGET_MS}ms target.")
+
+    # Keep session caches of other workers consistent (no-op unless SESSION_CACHE_CHANNEL is set)
+    start_session_invalidation_listener()
     
     # Create kafka topics
     create_kafka_topics()
@@ -32,16 +43,31 @@ async def lifespan(app: FastAPI):
     logger.info("Adding scrape_and_populate_redis job to scheduler...")
     scheduler.add_job(
         scrape_events,
-        CronTrigger(minute="*"),  # Run every 10 minutes
+        CronTrigger(minute="*"),  # Run every minute, reading only what changed since the last run
         id="scrape_and_populate_redis",
         replace_existing=True
     )
-    # Second cron job (poll Redis every minute)
-    logger.info("Adding poll_redis_for_events job to scheduler...")
+    dispatcher_task = None
+    if EVENT_DISPATCHER:
+        # Dispatch due events as they fall due, rather than on the next minute's poll
+        logger.info("Starting event dispatcher...")
+        dispatcher_task = asyncio.create_task(run_dispatcher())
+    else:
+        # Second cron job (poll Redis every minute)
+        logger.info("Adding poll_redis_for_events job to scheduler...")
+        scheduler.add_job(
+            poll_redis,
+            CronTrigger(minute="*"),  # Run every minute
+            id="poll_redis_for_events",
+            replace_existing=True
+        )
+
+    # Third cron job (drop expired sessions every hour)
+    logger.info("Adding purge_expired_sessions job to scheduler...")
     scheduler.add_job(
-        poll_redis,
-        CronTrigger(minute="*"),  # Run every minute
-        id="poll_redis_for_events",
+        purge_sessions,
+        CronTrigger(minute=0),  # Run every hour
+        id="purge_expired_sessions",
         replace_existing=True
     )
 
@@ -55,6 +81,9 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down scheduler...")
     scheduler.shutdown()
     logger.info("Scheduler shut down.")
+    if dispatcher_task is not None:
+        dispatcher_task.cancel()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -62,5 +91,11 @@ app = FastAPI(
     middleware=[Middleware(JWTAuthMiddleware)]
 )
 
-app.include_router(events.router, prefix="/api/events", tags=["Events"])
-app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
+# DB_MODE picks the threadpool routes on the sync engine or the async routes on AsyncSession
+if DB_MODE == "async":
+    app.include_router(events_async.router, prefix="/api/events", tags=["Events"])
+    app.include_router(auth_async.router, prefix="/api/auth", tags=["Auth"])
+else:
+    app.include_router(events.router, prefix="/api/events", tags=["Events"])
+    app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["Metrics"])
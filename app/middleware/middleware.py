@@ -1,70 +1,127 @@
-from fastapi import Request, HTTPException
-from fastapi.params import Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import re
+
+from fastapi import HTTPException
+from fastapi.security.utils import get_authorization_scheme_param
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import DB_MODE
 from app.core.security import SECRET_KEY, ALGORITHM
-from app.db.session import get_db
+from app.core.session_cache import get_cached_session, cache_session, get_cache_generation
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.repositories.auth import get_active_session_by_user_id
+from app.repositories.auth import aio as auth_aio
 from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
 ALLOWED_PREFIXES = ["/api/events","/api/auth/refresh","/api/auth/logout"]  # Routes to apply token validation
+PROTECTED_PATH_RE = re.compile("|".join(re.escape(prefix) for prefix in ALLOWED_PREFIXES))
+
+
+class AuthError(Exception):
+    def __init__(self, detail: str):
+        self.detail = detail
+
+
+def _get_bearer_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, credentials = get_authorization_scheme_param(value.decode("latin-1"))
+            if scheme.lower() == "bearer" and credentials:
+                return credentials
+            return None
+    return None
+
+
+class JWTAuthMiddleware:
+    """
+    Pure ASGI token validation for the protected prefixes.
+    A DB session is only checked out when the active session is not cached, and it is
+    handed to the route through request.state.db (request.state.async_db in async DB_MODE)
+    so the request holds a single connection.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not PROTECTED_PATH_RE.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
-class JWTAuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
-        self.bearer = HTTPBearer(auto_error=False)
+        state = scope.setdefault("state", {})
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
-        db_gen = get_db()
-        db = next(db_gen)
         try:
-            path = request.url.path
-
-            if any(path.startswith(prefix) for prefix in ALLOWED_PREFIXES):
-                credentials: HTTPAuthorizationCredentials = await self.bearer(request)
-                if not credentials or credentials.scheme.lower() != "bearer":
-                    return JSONResponse(status_code=401, content={"detail": "Missing or invalid token"})
-
-                try:
-                    payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-                    user_id = payload.get("user_id")
-                    if not user_id:
-                        return JSONResponse(status_code=401, content={"detail": "user_id missing in token"})
-
-                    session = get_active_session_by_user_id(db=db, user_id=user_id)
-                    if not session:
-                        return JSONResponse(status_code=401, content={"detail": "Session doesn't exist"})
-                    expiration = session.token_expiration_timestamp
-                    if expiration.tzinfo is None:
-                        expiration = expiration.replace(tzinfo=timezone.utc)
-                    if expiration <= datetime.now(timezone.utc):
-                        return JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})
-                    if session.token != credentials.credentials:
-                        return JSONResponse(status_code=401, content={"detail": "Invalid token"})
-
-                    request.state.user_id = user_id
-
-                except JWTError as jwt_err:
-                    logger.warning(f"JWT error: {jwt_err}")
-                    return JSONResponse(status_code=401, content={"detail": "Invalid token"})
-
-            response = await call_next(request)
-            return response
+            state["user_id"] = await self._authenticate(scope, state)
+            await self.app(scope, receive, send_wrapper)
+
+        except AuthError as auth_err:
+            await JSONResponse(status_code=401, content={"detail": auth_err.detail})(scope, receive, send)
 
         except HTTPException as http_exc:
             raise http_exc
 
         except Exception as e:
+            if response_started:
+                raise
             logger.exception(f"Internal server error during auth middleware: {str(e)}")
-            return JSONResponse(
+            await JSONResponse(
                 status_code=500,
                 content={"detail": "Internal server error occurred. Please contact support."}
-            )
+            )(scope, receive, send)
         finally:
-            db_gen.close()
+            db = state.pop("db", None)
+            if db is not None:
+                db.close()
+            async_db = state.pop("async_db", None)
+            if async_db is not None:
+                await async_db.close()
+
+    async def _load_session(self, state: dict, user_id: int):
+        if DB_MODE == "async":
+            state["async_db"] = AsyncSessionLocal()
+            return await auth_aio.get_active_session_by_user_id(state["async_db"], user_id=user_id)
+        state["db"] = SessionLocal()
+        return get_active_session_by_user_id(db=state["db"], user_id=user_id)
+
+    async def _authenticate(self, scope: Scope, state: dict) -> int:
+        token = _get_bearer_token(scope)
+        if not token:
+            raise AuthError("Missing or invalid token")
+
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError as jwt_err:
+            logger.warning(f"JWT error: {jwt_err}")
+            raise AuthError("Invalid token")
+
+        user_id = payload.get("user_id")
+        if not user_id:
+            raise AuthError("user_id missing in token")
+
+        # Served from the in-process cache when possible, skipping the DB round-trip
+        session = get_cached_session(user_id)
+        if not session:
+            generation = get_cache_generation()
+            db_session = await self._load_session(state, user_id)
+            if not db_session:
+                raise AuthError("Session doesn't exist")
+            session = cache_session(db_session, generation)
+
+        expiration = session.token_expiration_timestamp
+        if expiration.tzinfo is None:
+            expiration = expiration.replace(tzinfo=timezone.utc)
+        if expiration <= datetime.now(timezone.utc):
+            raise AuthError("Invalid or expired token")
+        if session.token != token:
+            raise AuthError("Invalid token")
+        return user_id
@@ -0,0 +1,18 @@
+import functools
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def to_async(fn):
+    """
+    Async version of a sync repository function taking the session as first argument.
+    The query runs through AsyncSession.run_sync, so I/O goes through the async driver on the
+    event loop while the query itself stays defined once, in the sync repository.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(fn, *args, **kwargs)
+
+    return wrapper
+
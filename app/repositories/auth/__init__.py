@@ -1,4 +1,5 @@
 # app/repositories/__init__.py
 
 from .user import *
+from .session_store import *
 from .active_sessions import *
@@ -0,0 +1,13 @@
+# Async versions of the auth repository functions, for use with an AsyncSession
+from app.repositories.aio import to_async
+from app.repositories.auth import active_sessions, user
+
+create_user = to_async(user.create_user)
+get_user_by_email = to_async(user.get_user_by_email)
+get_user_by_phone = to_async(user.get_user_by_phone)
+get_user_by_username = to_async(user.get_user_by_username)
+
+create_active_session = to_async(active_sessions.create_active_session)
+get_active_session_by_user_id = to_async(active_sessions.get_active_session_by_user_id)
+update_active_session = to_async(active_sessions.update_active_session)
+delete_active_session = to_async(active_sessions.delete_active_session)
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.config import redis_client, SESSION_STORE, SESSION_STORE_SQL_FALLBACK, \
+    SESSION_STORE_SQL_FALLBACK_REFRESH_SECONDS
+from app.db.models.auth import ActiveSession
+from app.utils import SESSION_EXPIRATION_MS
+from app.utils.concurrency import run_blocking
+
+__all__ = ["SqlSessionStore", "RedisSessionStore", "build_session_store", "session_store"]
+
+
+def _new_expiration() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(milliseconds=SESSION_EXPIRATION_MS)
+
+
+class SqlSessionStore:
+    """Sessions as rows of the active_sessions table."""
+
+    def create(self, db: Session, user_id: int, token: str) -> ActiveSession:
+        db_session = ActiveSession(user_id=user_id, token=token, token_expiration_timestamp=_new_expiration())
+        db.add(db_session)
+        db.commit()
+        db.refresh(db_session)
+        return db_session
+
+    def get(self, db: Session, user_id: int) -> ActiveSession | None:
+        return db.query(ActiveSession).filter(ActiveSession.user_id == user_id).first()
+
+    def update(self, db: Session, user_id: int, new_token: str = None) -> ActiveSession | None:
+        db_session = self.get(db, user_id)
+        if not db_session:
+            # Create a new session if none exists
+            return self.create(db, user_id, new_token)
+
+        if new_token:
+            db_session.token = new_token
+        db_session.token_expiration_timestamp = _new_expiration()
+        db.commit()
+        db.refresh(db_session)
+        return db_session
+
+    def extend(self, db: Session, user_id: int, token: str) -> bool:
+        """Moves the expiry of the user's session if it still has this token; never creates one."""
+        extended = (
+            db.query(ActiveSession)
+            .filter(ActiveSession.user_id == user_id, ActiveSession.token == token)
+            .update({ActiveSession.token_expiration_timestamp: _new_expiration()}, synchronize_session=False)
+        )
+        db.commit()
+        return extended > 0
+
+    def delete(self, db: Session, user_id: int) -> None:
+        db.query(ActiveSession).filter(ActiveSession.user_id == user_id).delete(synchronize_session=False)
+        db.commit()
+
+    def purge_expired(self, db: Session) -> int:
+        deleted = (
+            db.query(ActiveSession)
+            .filter(ActiveSession.token_expiration_timestamp <= datetime.now(timezone.utc))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+
+class RedisSessionStore:
+    """
+    Sessions as Redis keys whose TTL is the session expiry, so expired sessions disappear on their own.
+    With a SQL fallback, logins and logouts are also written to the table and a Redis miss is
+    re-populated from it. Sliding refreshes also move the row's expiry, at most once per
+    SESSION_STORE_SQL_FALLBACK_REFRESH_SECONDS, so after a Redis outage a session ends at most that late.
+    """
+
+    KEY_PREFIX = "active_session:"
+    SYNCED_KEY_PREFIX = "active_session_synced:"
+
+    def __init__(self, client, fallback: SqlSessionStore | None = None):
+        self.client = client
+        self.fallback = fallback
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    def _set(self, user_id: int, token: str, ttl_ms: int) -> ActiveSession:
+        run_blocking(self.client.set, self._key(user_id), token, px=ttl_ms)
+        return ActiveSession(
+            user_id=user_id,
+            token=token,
+            token_expiration_timestamp=datetime.now(timezone.utc) + timedelta(milliseconds=ttl_ms),
+        )
+
+    def create(self, db: Session, user_id: int, token: str) -> ActiveSession:
+        if self.fallback:
+            self.fallback.update(db, user_id, token)
+        return self._set(user_id, token, SESSION_EXPIRATION_MS)
+
+    def get(self, db: Session, user_id: int) -> ActiveSession | None:
+        # GET and PTTL in a single round-trip
+        token, ttl_ms = run_blocking(self.client.pipeline(transaction=False).get(self._key(user_id)).pttl(self._key(user_id)).execute)
+        if token is not None and ttl_ms > 0:
+            return ActiveSession(
+                user_id=user_id,
+                token=token.decode() if isinstance(token, bytes) else token,
+                token_expiration_timestamp=datetime.now(timezone.utc) + timedelta(milliseconds=ttl_ms),
+            )
+        if not self.fallback:
+            return None
+
+        db_session = self.fallback.get(db, user_id)
+        if not db_session:
+            return None
+        expiration = db_session.token_expiration_timestamp
+        if expiration.tzinfo is None:
+            expiration = expiration.replace(tzinfo=timezone.utc)
+        remaining_ms = int((expiration - datetime.now(timezone.utc)).total_seconds() * 1000)
+        if remaining_ms <= 0:
+            return None
+        return self._set(user_id, db_session.token, remaining_ms)
+
+    def update(self, db: Session, user_id: int, new_token: str = None) -> ActiveSession | None:
+        if new_token:
+            return self.create(db, user_id, new_token)
+        # Sliding expiry is a single PEXPIRE, pipelined with a GET so the caller still gets the session back
+        extended, token = run_blocking(
+            self.client.pipeline(transaction=False)
+            .pexpire(self._key(user_id), SESSION_EXPIRATION_MS)
+            .get(self._key(user_id))
+            .execute
+        )
+        if not extended or token is None:
+            if not self.fallback:
+                return None
+            # Redis lost the key: re-populate it from the row as get() does, then slide it
+            db_session = self.get(db, user_id)
+            if not db_session:
+                return None
+            run_blocking(self.client.pexpire, self._key(user_id), SESSION_EXPIRATION_MS)
+            token = db_session.token
+        token = token.decode() if isinstance(token, bytes) else token
+        if self.fallback:
+            # Claims this interval's fallback write, now that the session is known to exist; SET NX lets a
+            # single worker win it
+            refresh_ms = int(SESSION_STORE_SQL_FALLBACK_REFRESH_SECONDS * 1000)
+            if run_blocking(self.client.set, f"{self.SYNCED_KEY_PREFIX}{user_id}", 1, nx=True, px=refresh_ms):
+                # Only an existing row with this token: a logout or a new login in the meantime wins
+                self.fallback.extend(db, user_id, token)
+        return ActiveSession(user_id=user_id, token=token, token_expiration_timestamp=_new_expiration())
+
+    def delete(self, db: Session, user_id: int) -> None:
+        # Row first: a concurrent get() that misses Redis must no longer find it, or it would copy the
+        # session back into Redis after the logout
+        if self.fallback:
+            self.fallback.delete(db, user_id)
+        run_blocking(self.client.delete, self._key(user_id))
+
+    def purge_expired(self, db: Session) -> int:
+        return self.fallback.purge_expired(db) if self.fallback else 0
+
+
+def build_session_store():
+    if SESSION_STORE == "redis":
+        return RedisSessionStore(redis_client, fallback=SqlSessionStore() if SESSION_STORE_SQL_FALLBACK else None)
+    return SqlSessionStore()
+
+
+session_store = build_session_store()
@@ -5,11 +5,12 @@ from app.core.security import hash_password
 from typing import List, Set, Any
 
 
-def create_user(db: Session, user: UserCreate):
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None):
+    # Async callers hash off the event loop beforehand and pass the result in
     db_user = User(
         username=user.username,
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=hashed_password or hash_password(user.password),
         phone_number=user.phone_number,
     )
     db.add(db_user)
@@ -5,4 +5,7 @@ from .event_info import *
 from .event_access import *
 from .recurrance import *
 from .change_log import *
-from .joint_queries import *
\ No newline at end of file
+from .joint_queries import *
+from .bulk import *
+from .event_snapshot import *
+from .change_set import *
\ No newline at end of file
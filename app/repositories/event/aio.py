@@ -0,0 +1,22 @@
+# Async versions of the event repository functions, for use with an AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.aio import to_async
+from app.repositories.event import change_log, event
+
+get_event_times_starting_between = to_async(event.get_event_times_starting_between)
+get_event_times_updated_since = to_async(event.get_event_times_updated_since)
+
+
+async def stream_change_logs_in_version_range(db: AsyncSession, event_id: int, from_version: int, to_version: int):
+    """
+    change_log.get_change_logs_in_version_range read through the async driver. Rows arrive in batches while
+    the caller consumes them, so a long history never sits in memory or holds a worker thread.
+    """
+    result = await db.stream(change_log.change_logs_in_version_range_query(event_id, from_version, to_version))
+    try:
+        async for row in result:
+            for change in change_log.expand_change_rows(row):
+                yield change
+    finally:
+        await result.close()
@@ -0,0 +1,54 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models.events.event_access import EventAccess
+from app.db.models.events.event_info import EventInfo
+from app.db.models.events.events import Event
+from app.db.models.events.recurrance import Recurrence
+
+
+def bulk_create_event_infos(db: Session, rows: list[dict]) -> list[int]:
+    """
+    Inserts event_info rows with multi-row INSERTs and returns their ids in input order.
+    MySQL has no RETURNING, so there the ids are derived from LAST_INSERT_ID() of a single
+    multi-row statement and checked against the inserted rows; other dialects use RETURNING.
+    Must be the first write of the transaction, the MySQL fallback rolls it back.
+    """
+    if not rows:
+        return []
+
+    if db.get_bind().dialect.name != "mysql":
+        result = db.execute(insert(EventInfo).returning(EventInfo.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars())
+
+    # LAST_INSERT_ID() is the id of the first row; InnoDB hands a single multi-row INSERT
+    # consecutive ids unless innodb_autoinc_lock_mode=2 interleaves concurrent inserts
+    first_id = db.execute(insert(EventInfo).values(rows)).lastrowid
+    ids = list(range(first_id, first_id + len(rows)))
+    inserted = db.execute(
+        select(EventInfo.id, EventInfo.title, EventInfo.description, EventInfo.location)
+        .where(EventInfo.id.between(ids[0], ids[-1]))
+        .order_by(EventInfo.id)
+    ).all()
+    expected = [(id_, row["title"], row["description"], row["location"]) for id_, row in zip(ids, rows)]
+    if [tuple(row) for row in inserted] == expected:
+        return ids
+
+    # Ids were not consecutive: drop what was inserted and fall back to one row per statement
+    db.rollback()
+    return [db.execute(insert(EventInfo).values(row)).inserted_primary_key[0] for row in rows]
+
+
+def bulk_create_events(db: Session, rows: list[dict]) -> None:
+    if rows:
+        db.execute(insert(Event), rows)
+
+
+def bulk_create_event_accesses(db: Session, rows: list[dict]) -> None:
+    if rows:
+        db.execute(insert(EventAccess), rows)
+
+
+def bulk_create_recurrences(db: Session, rows: list[dict]) -> None:
+    if rows:
+        db.execute(insert(Recurrence), rows)
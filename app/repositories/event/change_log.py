@@ -1,8 +1,14 @@
 # app/db/repositories/change_log.py
+from datetime import datetime, timezone
 from typing import Any
 
+from sqlalchemy import func, insert, literal_column, null, select, union_all
 from sqlalchemy.orm import Session
 from app.db.models.events.change_log import ChangeLog
+from app.db.models.events.change_set import ChangeSet
+
+# Rows fetched per round-trip when streaming long histories
+CHANGE_LOG_YIELD_PER = 1000
 
 
 def create_change_log(
@@ -21,33 +27,37 @@ def create_change_log(
         new_val=new_val,
     )
     db.add(change)
-    db.commit()
-    db.refresh(change)
+    db.flush()  # assigns the id, the caller commits
     return change
 
 
 def create_bulk_change_logs(
     db: Session,
     changes: list[dict],
-) -> list[ChangeLog]:
-    logs = [
-        ChangeLog(
-            event_id=change["event_id"],
-            new_version_id=change["new_version_id"],
-            field_name=change["field_name"],
-            old_val=change.get("old_val"),
-            new_val=change.get("new_val"),
-        )
+) -> int:
+    """Writes all changes with one multi-row INSERT. Returns the number of rows, the caller commits."""
+    if not changes:
+        return 0
+    changed_at = datetime.now(timezone.utc)
+    rows = [
+        {
+            "event_id": change["event_id"],
+            "new_version_id": change["new_version_id"],
+            "field_name": change["field_name"],
+            "old_val": ChangeLog._convert_to_str(change.get("old_val")),
+            "new_val": ChangeLog._convert_to_str(change.get("new_val")),
+            "changed_at": changed_at,
+        }
         for change in changes
     ]
-    db.add_all(logs)
-    db.commit()
-    return logs
+    db.execute(insert(ChangeLog).values(rows))
+    return len(rows)
 
 
 def get_change_logs_by_event(
     db: Session, event_id: int
 ) -> list[type[ChangeLog]]:
+    # change_log rows only; use get_change_logs_in_version_range to read compact change sets too
     return db.query(ChangeLog).filter(ChangeLog.event_id == event_id).order_by(ChangeLog.new_version_id.asc(), ChangeLog.id.asc()).all()
 
 
@@ -62,12 +72,73 @@ def get_change_logs_by_version(
         )
         .all()
     )
+def get_version_change_id(db: Session, event_id: int, version_id: int) -> tuple[int | None, int | None]:
+    """
+    (newest change_log id, change_set id) of a version. Changes when a rollback lets the version be written
+    again, in either format, or when the version is compacted.
+    """
+    last_row = (
+        select(func.max(ChangeLog.id))
+        .where(ChangeLog.event_id == event_id, ChangeLog.new_version_id == version_id)
+        .scalar_subquery()
+    )
+    last_set = (
+        select(ChangeSet.id)
+        .where(ChangeSet.event_id == event_id, ChangeSet.new_version_id == version_id)
+        .scalar_subquery()
+    )
+    return tuple(db.execute(select(last_row, last_set)).one())
+
+
+def change_logs_in_version_range_query(event_id: int, from_version: int, to_version: int):
+    """
+    Both formats through one query, so a history written partly as change_log rows and partly as compact
+    change sets reads the same. Rows are (new_version_id, id, field_name, old_val, new_val, changes),
+    with changes set only on change set rows; expand them with expand_change_rows.
+    """
+    rows = (
+        select(ChangeLog.new_version_id, ChangeLog.id, ChangeLog.field_name, ChangeLog.old_val, ChangeLog.new_val,
+               null().label("changes"))
+        .where(ChangeLog.event_id == event_id, ChangeLog.new_version_id.between(from_version, to_version))
+    )
+    change_sets = (
+        select(ChangeSet.new_version_id, ChangeSet.id, null(), null(), null(), ChangeSet.changes)
+        .where(ChangeSet.event_id == event_id, ChangeSet.new_version_id.between(from_version, to_version))
+    )
+    statement = union_all(rows, change_sets).order_by(literal_column("new_version_id"), literal_column("id"))
+    return statement.execution_options(yield_per=CHANGE_LOG_YIELD_PER)
+
+
+def expand_change_rows(row) -> list[tuple[int, Any, Any, Any]]:
+    """(new_version_id, field_name, old_val, new_val) of a change_logs_in_version_range_query row."""
+    version_id, _, field_name, old_val, new_val, changes = row
+    if changes is None:
+        return [(version_id, field_name, old_val, new_val)]
+    return [
+        (version_id, field_name, old_val, new_val)
+        for field_name, (old_val, new_val) in ChangeSet.decode(changes).items()
+    ]
+
+
+def get_change_logs_in_version_range(
+    db: Session, event_id: int, from_version: int, to_version: int
+):
+    """
+    Streams (new_version_id, field_name, old_val, new_val) for versions from_version..to_version inclusive,
+    in the order the changes were made. Consume it fully before issuing another query on the session.
+    Each compact change set is expanded into its fields.
+    """
+    with db.execute(change_logs_in_version_range_query(event_id, from_version, to_version)) as result:
+        for row in result:
+            yield from expand_change_rows(row)
+
+
 def delete_change_logs_from_version_onwards(
     db: Session, event_id: int, version_id: int
 ) -> int:
     """
     Deletes all change log entries for the given event_id from the given version_id (inclusive) onwards.
-    Returns the number of rows deleted.
+    Returns the number of rows deleted. The caller commits.
     """
     deleted = (
         db.query(ChangeLog)
@@ -77,5 +148,18 @@ def delete_change_logs_from_version_onwards(
         )
         .delete(synchronize_session=False)
     )
-    db.commit()
-    return deleted
\ No newline at end of file
+    return deleted
+
+
+def delete_change_logs_up_to_version(db: Session, event_id: int, version_id: int) -> int:
+    """Deletes the event's change log entries up to version_id (inclusive). The caller commits."""
+    return (
+        db.query(ChangeLog)
+        .filter(ChangeLog.event_id == event_id, ChangeLog.new_version_id <= version_id)
+        .delete(synchronize_session=False)
+    )
+
+
+def delete_change_logs_by_event(db: Session, event_id: int) -> int:
+    """Deletes all change log entries of the event in one statement. Returns the row count, the caller commits."""
+    return db.query(ChangeLog).filter(ChangeLog.event_id == event_id).delete(synchronize_session=False)
@@ -0,0 +1,40 @@
+# app/db/repositories/change_set.py
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.db.models.events.change_set import ChangeSet
+
+
+def create_bulk_change_sets(db: Session, change_sets: list[dict]) -> int:
+    """
+    Writes one change_set row per {"event_id", "new_version_id", "changes": {field: (old, new)}} with a
+    single INSERT. Returns the number of rows, the caller commits.
+    """
+    if not change_sets:
+        return 0
+    changed_at = datetime.now(timezone.utc)
+    db.execute(insert(ChangeSet).values([
+        {
+            "event_id": change_set["event_id"],
+            "new_version_id": change_set["new_version_id"],
+            "changes": ChangeSet.encode(change_set["changes"]),
+            "changed_at": change_set.get("changed_at") or changed_at,
+        }
+        for change_set in change_sets
+    ]))
+    return len(change_sets)
+
+
+def delete_change_sets_from_version_onwards(db: Session, event_id: int, version_id: int) -> int:
+    """Deletes the event's change sets from version_id (inclusive) onwards. The caller commits."""
+    return (
+        db.query(ChangeSet)
+        .filter(ChangeSet.event_id == event_id, ChangeSet.new_version_id >= version_id)
+        .delete(synchronize_session=False)
+    )
+
+
+def delete_change_sets_by_event(db: Session, event_id: int) -> int:
+    """Deletes all change sets of the event in one statement. The caller commits."""
+    return db.query(ChangeSet).filter(ChangeSet.event_id == event_id).delete(synchronize_session=False)
@@ -14,8 +14,7 @@ def create_event(db: Session, event: EventCreateInternal)->Event:
         status=event.status
     )
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    db.flush()  # assigns the id, the caller commits
     return db_event
 
 def get_event_by_event_id(db: Session, event_id: int) -> Event|None:
@@ -24,5 +23,28 @@ def get_event_by_event_id(db: Session, event_id: int) -> Event|None:
 def get_events_in_time_range(db: Session, start, end) -> list[type[Event]]:
     return db.query(Event).filter(Event.start_time >= start, Event.start_time < end).all()
 
+def get_event_times_starting_between(db: Session, after, until) -> list:
+    """(id, start_time, end_time, status) of occurrences with after < start_time <= until, from the index."""
+    return (
+        db.query(Event.id, Event.start_time, Event.end_time, Event.status)
+        .filter(Event.start_time > after, Event.start_time <= until)
+        .all()
+    )
+
+def get_event_times_updated_since(db: Session, since) -> list:
+    """(id, start_time, end_time, status) of occurrences created or changed after since."""
+    return (
+        db.query(Event.id, Event.start_time, Event.end_time, Event.status)
+        .filter(Event.updated_at > since)
+        .all()
+    )
+
+def get_event_ids_by_event_id(db: Session, event_id: int) -> list[int]:
+    return [row.id for row in db.query(Event.id).filter(Event.event_id == event_id)]
+
 def get_first_scheduled_event(db: Session, event_id: int) -> Event|None:
-    db.query(Event).filter(Event.id == event_id, Event.status == "SCHEDULED").first()
\ No newline at end of file
+    db.query(Event).filter(Event.id == event_id, Event.status == "SCHEDULED").first()
+
+
+def delete_events_by_event_id(db: Session, event_id: int) -> int:
+    return db.query(Event).filter(Event.event_id == event_id).delete(synchronize_session=False)
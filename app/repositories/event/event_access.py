@@ -1,3 +1,4 @@
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.db.models.events import EventAccess
 from app.schemas import EventAccessCreate
@@ -12,14 +13,12 @@ def create_event_access(db: Session, access: EventAccessCreate)->EventAccess:
         access=access.access
     )
     db.add(db_access)
-    db.commit()
-    db.refresh(db_access)
+    db.flush()  # assigns the id, the caller commits
     return db_access
 
 def update_event_access(db: Session, db_access: EventAccess, new_access_level: AccessLevel) -> EventAccess:
     db_access.access = new_access_level
-    db.commit()
-    db.refresh(db_access)
+    db.flush()  # the caller commits
     return db_access
 
 def get_access_by_user_and_event(db: Session, user_id: int, event_id: int):
@@ -28,10 +27,40 @@ def get_access_by_user_and_event(db: Session, user_id: int, event_id: int):
 def get_accesses_by_event(db: Session, event_id: int)->List[EventAccess]:
     return db.query(EventAccess).filter(EventAccess.event_id == event_id).all()
 
+def delete_accesses_by_event(db: Session, event_id: int) -> int:
+    return db.query(EventAccess).filter(EventAccess.event_id == event_id).delete(synchronize_session=False)
 
+def upsert_event_accesses(db: Session, event_id: int, grants: dict[int, AccessLevel]) -> None:
+    """
+    Grants `access` to each user of `grants` ({user_id: access}) with one multi-row INSERT that updates
+    the existing (user_id, event_id) rows instead. Dialects without a known upsert syntax take one read
+    and the inserts instead. The caller commits.
+    """
+    if not grants:
+        return
+    rows = [{"user_id": user_id, "event_id": event_id, "access": access} for user_id, access in grants.items()]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(EventAccess).values(rows)
+        stmt = stmt.on_duplicate_key_update(access=stmt.inserted.access)
+    elif dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect == "sqlite" else postgresql).insert(EventAccess).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EventAccess.user_id, EventAccess.event_id], set_={"access": stmt.excluded.access}
+        )
+    else:
+        _select_then_insert_event_accesses(db, event_id, grants)
+        return
+    db.execute(stmt)
 
-
-
-
-
-
+def _select_then_insert_event_accesses(db: Session, event_id: int, grants: dict[int, AccessLevel]) -> None:
+    existing = (
+        db.query(EventAccess)
+        .filter(EventAccess.event_id == event_id, EventAccess.user_id.in_(grants))
+        .all()
+    )
+    for db_access in existing:
+        db_access.access = grants[db_access.user_id]
+    granted = {db_access.user_id for db_access in existing}
+    db.add_all(EventAccess(user_id, event_id, access) for user_id, access in grants.items() if user_id not in granted)
+    db.flush()  # the caller commits
@@ -9,12 +9,31 @@ def create_event_info(db: Session, event: EventInfoCreate)->EventInfo:
         location=event.location,
     )
     db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    db.flush()  # assigns the id, the caller commits
     return db_event
 
 def get_event_info_by_id(db: Session, event_id: int)->EventInfo|None:
     return db.query(EventInfo).filter(EventInfo.id == event_id).first()
 
+def lock_event_info(db: Session, event_id: int)->EventInfo|None:
+    """
+    Reads the event with FOR UPDATE: writers of its version or change history wait until the caller commits.
+    An already loaded EventInfo is refreshed from the locked row, so its version is the current one.
+    """
+    return db.query(EventInfo).filter(EventInfo.id == event_id).with_for_update().populate_existing().first()
+
 def get_all_event_info(db: Session):
     return db.query(EventInfo).all()
+
+def delete_event_info(db: Session, event_id: int) -> int:
+    return db.query(EventInfo).filter(EventInfo.id == event_id).delete(synchronize_session=False)
+
+def get_event_infos_after(db: Session, after_id: int, limit: int, min_version: int = 1) -> list[EventInfo]:
+    """Keyset batch of events ordered by id, for jobs walking the whole table."""
+    return (
+        db.query(EventInfo)
+        .filter(EventInfo.id > after_id, EventInfo.version >= min_version)
+        .order_by(EventInfo.id)
+        .limit(limit)
+        .all()
+    )
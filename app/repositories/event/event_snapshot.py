@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+
+from app.db.models.events.event_snapshot import EventSnapshot
+
+
+def create_event_snapshot(db: Session, event_id: int, version: int, state: dict) -> EventSnapshot:
+    snapshot = EventSnapshot(event_id=event_id, version=version, state=state)
+    db.add(snapshot)
+    db.flush()  # the caller commits
+    return snapshot
+
+
+def get_nearest_event_snapshot(db: Session, event_id: int, version_id: int) -> EventSnapshot | None:
+    """
+    The snapshot closest to version_id, the older one on a tie. Two seeks on (event_id, version), one on
+    each side, instead of ranking every snapshot of the event by distance.
+    """
+    query = db.query(EventSnapshot).filter(EventSnapshot.event_id == event_id)
+    below = query.filter(EventSnapshot.version <= version_id).order_by(EventSnapshot.version.desc()).first()
+    if below is not None and below.version == version_id:
+        return below
+    above = query.filter(EventSnapshot.version > version_id).order_by(EventSnapshot.version.asc()).first()
+    if below is None or above is None:
+        return below or above
+    return below if version_id - below.version <= above.version - version_id else above
+
+
+def get_event_snapshot_versions(db: Session, event_id: int) -> set[int]:
+    return {version for version, in db.query(EventSnapshot.version).filter(EventSnapshot.event_id == event_id)}
+
+
+def delete_event_snapshots_from_version_onwards(db: Session, event_id: int, version_id: int) -> int:
+    """Deletes the snapshots of versions >= version_id. The caller commits."""
+    return (
+        db.query(EventSnapshot)
+        .filter(EventSnapshot.event_id == event_id, EventSnapshot.version >= version_id)
+        .delete(synchronize_session=False)
+    )
@@ -1,10 +1,61 @@
-from sqlalchemy import and_
+from datetime import datetime
+
+from sqlalchemy import String, and_, cast, func, or_, select
 from sqlalchemy import asc, desc
 from sqlalchemy.orm import Session
 
+from app.core.config import EVENT_COUNT_CACHE_TTL_SECONDS, EVENT_COUNT_ESTIMATE_CAP
+
 from app.db.models import Recurrence
-from app.db.models.events import Event, EventAccess, EventInfo
-from app.schemas.api.events import CombinedEventResponse, EventFilterRequest, EventFilterResponse
+from app.db.models.auth import User
+from app.db.models.events import ChangeLog, ChangeSet, Event, EventAccess, EventInfo
+from app.schemas.api.events import CombinedEventResponse, EventFilterRequest, EventFilterResponse, TIME_SORT_KEYS
+from app.utils import AccessLevel
+from app.utils.cache import TTLCache
+from app.utils.cursor import decode_cursor, encode_cursor
+
+
+# Sort keys for the filter endpoint. location and status are compared as plain strings so that
+# ORDER BY and the keyset predicate agree (NULL locations sort as "", MySQL ENUMs sort by position)
+SORT_COLUMN_MAP = {
+    "start_time": Event.start_time,
+    "end_time": Event.end_time,
+    "title": EventInfo.title,
+    "location": func.coalesce(EventInfo.location, ""),
+    "status": cast(Event.status, String),
+}
+
+event_count_cache = TTLCache(maxsize=10000, ttl=EVENT_COUNT_CACHE_TTL_SECONDS)
+
+
+def _count_filtered_events(filtered_query, filters: EventFilterRequest, user_id: int) -> tuple[int | None, bool]:
+    """Returns (total_count, is_estimate) for the requested count_mode."""
+    if filters.count_mode == "none":
+        return None, False
+
+    if filters.count_mode == "estimate":
+        # COUNT over a LIMITed subquery stops scanning once the cap is reached
+        count = filtered_query.limit(EVENT_COUNT_ESTIMATE_CAP + 1).count()
+        if count > EVENT_COUNT_ESTIMATE_CAP:
+            return EVENT_COUNT_ESTIMATE_CAP, True
+        return count, False
+
+    if filters.count_mode == "cached":
+        key = (user_id, filters.title, filters.location, filters.status, filters.access)
+        count = event_count_cache.get(key)
+        if count is None:
+            count = filtered_query.count()
+            event_count_cache.set(key, count)
+        return count, False
+
+    return filtered_query.count(), False
+
+
+def _seek_filter(sort_column, order: str, value, last_id: int):
+    """Rows strictly after (value, last_id) in (sort_column, events.id) order."""
+    if order == "asc":
+        return or_(sort_column > value, and_(sort_column == value, Event.id > last_id))
+    return or_(sort_column < value, and_(sort_column == value, Event.id < last_id))
 
 
 def get_filtered_events_paginated(
@@ -29,23 +80,38 @@ def get_filtered_events_paginated(
 
     filtered_query = base_query.filter(and_(*query_filters))
 
-    # Count total records before pagination
-    total_count = filtered_query.count()
+    total_count, is_estimate = _count_filtered_events(filtered_query, filters, user_id)
+
+    # The cursor carries the sort it was issued for, so a page always continues the same ordering
+    cursor = decode_cursor(filters.cursor) if filters.cursor else None
+    sort_by = cursor["sort_by"] if cursor else filters.sort_by
+    sort_order = cursor["sort_order"] if cursor else filters.sort_order
+    if sort_by not in SORT_COLUMN_MAP:
+        sort_by = "start_time"
+    if sort_order != "asc":
+        sort_order = "desc"
+
+    # Apply sorting, events.id breaks ties so pages are stable
+    sort_column = SORT_COLUMN_MAP[sort_by]
+    order_fn = asc if sort_order == "asc" else desc
+    sorted_query = (
+        filtered_query.add_columns(sort_column.label("sort_key"))
+        .order_by(order_fn(sort_column), order_fn(Event.id))
+    )
 
-    # Apply sorting
-    sort_column_map = {
-        "start_time": Event.start_time,
-        "end_time": Event.end_time,
-        "title": EventInfo.title,
-        "location": EventInfo.location,
-        "status": Event.status,
-    }
-    sort_column = sort_column_map.get(filters.sort_by, Event.start_time)
-    order_fn = asc if filters.sort_order == "asc" else desc
-    sorted_query = filtered_query.order_by(order_fn(sort_column))
+    # Apply pagination: seek past the cursor, or skip `offset` rows for existing clients
+    if cursor:
+        value = cursor["value"]
+        if sort_by in TIME_SORT_KEYS:
+            value = datetime.fromisoformat(value)
+        page_query = sorted_query.filter(_seek_filter(sort_column, sort_order, value, cursor["id"]))
+    else:
+        page_query = sorted_query.offset(filters.offset)
 
-    # Apply pagination
-    results = sorted_query.limit(filters.limit).offset(filters.offset).all()
+    # One extra row tells whether there is a next page
+    results = page_query.limit(filters.limit + 1).all()
+    has_more = len(results) > filters.limit
+    results = results[:filters.limit]
 
     events = [
         CombinedEventResponse(
@@ -58,13 +124,25 @@ def get_filtered_events_paginated(
             location=ei.location,
             access=ea.access,
         )
-        for e, ei, ea in results
+        for e, ei, ea, _ in results
     ]
 
+    next_cursor = None
+    if has_more:
+        last_event, _, _, last_key = results[-1]
+        next_cursor = encode_cursor({
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+            "value": last_key.isoformat() if isinstance(last_key, datetime) else last_key,
+            "id": last_event.id,
+        })
+
     return EventFilterResponse(
         events=events,
         total_count=total_count,
-        final_offset=filters.offset + len(events),
+        total_count_is_estimate=is_estimate,
+        final_offset=None if cursor else filters.offset + len(events),
+        next_cursor=next_cursor,
     )
 
 
@@ -79,3 +157,64 @@ def save_event(db: Session, event: Event):
 def save_recurrence(db: Session, recurrence: Recurrence):
     db.add(recurrence)
 
+
+
+def _current_occurrence_id(event_id: int):
+    # The occurrence get_event_by_event_id returns: the first events row of the event
+    return select(func.min(Event.id)).where(Event.event_id == event_id).scalar_subquery()
+
+
+def _last_change_ids(event_id: int):
+    # Newest id of each change log format, kept apart: any write or rollback in either table changes one
+    last_row = select(func.max(ChangeLog.id)).where(ChangeLog.event_id == event_id).scalar_subquery()
+    last_set = select(func.max(ChangeSet.id)).where(ChangeSet.event_id == event_id).scalar_subquery()
+    return last_row.label("last_change_id"), last_set.label("last_change_set_id")
+
+
+def get_event_with_access(db: Session, user_id: int, event_id: int):
+    """
+    The user's access together with the event info, current occurrence, recurrence and newest change_log and
+    change_set ids, in one round-trip. Returns None without access; info/occurrence/recurrence are None when missing.
+    """
+    return (
+        db.query(EventAccess, EventInfo, Event, Recurrence, *_last_change_ids(event_id))
+        .outerjoin(EventInfo, EventInfo.id == EventAccess.event_id)
+        .outerjoin(Event, Event.id == _current_occurrence_id(event_id))
+        .outerjoin(Recurrence, Recurrence.event_id == EventAccess.event_id)
+        .filter(EventAccess.user_id == user_id, EventAccess.event_id == event_id)
+        .first()
+    )
+
+
+def get_event_cache_tag(db: Session, user_id: int, event_id: int):
+    """
+    The user's access and the columns that identify the event's current state:
+    (access, version, occurrence_id, status, last_change_id, last_change_set_id). None without access.
+    """
+    return (
+        db.query(
+            EventAccess.access,
+            EventInfo.version,
+            Event.id.label("occurrence_id"),
+            Event.status,
+            *_last_change_ids(event_id),
+        )
+        .outerjoin(EventInfo, EventInfo.id == EventAccess.event_id)
+        .outerjoin(Event, Event.id == _current_occurrence_id(event_id))
+        .filter(EventAccess.user_id == user_id, EventAccess.event_id == event_id)
+        .first()
+    )
+
+
+def get_users_event_access(db: Session, event_id: int, user_ids: list[int]) -> dict[int, AccessLevel | None]:
+    """
+    {user_id: current access to the event, None when not shared} for the user_ids that exist,
+    read in one query.
+    """
+    rows = (
+        db.query(User.id, EventAccess.access)
+        .outerjoin(EventAccess, and_(EventAccess.user_id == User.id, EventAccess.event_id == event_id))
+        .filter(User.id.in_(user_ids))
+        .all()
+    )
+    return {user_id: access for user_id, access in rows}
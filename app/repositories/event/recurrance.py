@@ -14,9 +14,11 @@ def create_recurrence(db: Session, rec: RecurrenceCreate)->Recurrence:
         duration=rec.duration,
     )
     db.add(db_rec)
-    db.commit()
-    db.refresh(db_rec)
+    db.flush()  # assigns the id, the caller commits
     return db_rec
 
 def get_recurrence_by_event_id(db: Session, event_id: int)-> Recurrence | None:
     return db.query(Recurrence).filter(Recurrence.event_id == event_id).first()
+
+def delete_recurrence_by_event_id(db: Session, event_id: int) -> int:
+    return db.query(Recurrence).filter(Recurrence.event_id == event_id).delete(synchronize_session=False)
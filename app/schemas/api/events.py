@@ -1,11 +1,12 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 from pydantic import BaseModel, Field, field_validator
 
 
 from app.utils import AccessLevel, RecurrencePattern
 from app.utils import EventStatus
+from app.utils.cursor import decode_cursor
 
 
 class EventCreate(BaseModel):
@@ -95,8 +96,16 @@ class CombinedEventResponse(BaseModel):
     }
 class EventFilterResponse(BaseModel):
     events: List[CombinedEventResponse]
-    total_count: int
-    final_offset: int
+    total_count: Optional[int]  # None when count_mode is "none"
+    total_count_is_estimate: bool = False  # "estimate" stopped counting at the cap
+    final_offset: Optional[int]  # None on cursor pages, where offsets do not apply
+    next_cursor: Optional[str] = None  # pass back as `cursor` for the next page, None on the last page
+
+# Sort keys of the filter endpoint (the keys of joint_queries.SORT_COLUMN_MAP); cursors carry the time ones
+# as ISO strings
+TIME_SORT_KEYS = ("start_time", "end_time")
+SORT_KEYS = TIME_SORT_KEYS + ("title", "location", "status")
+
 
 class EventFilterRequest(BaseModel):
     title: Optional[str] = None
@@ -105,9 +114,30 @@ class EventFilterRequest(BaseModel):
     access: Optional[AccessLevel] = None
     limit: int = Field(default=10, ge=1)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # keyset paging, takes precedence over offset
+    count_mode: Literal["exact", "estimate", "cached", "none"] = "exact"
     sort_by: Optional[str] = "start_time"
     sort_order: Optional[str] = "asc"  # "asc" or "desc"
 
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, value):
+        if value is not None:
+            data = decode_cursor(value)
+            if not {"sort_by", "sort_order", "value", "id"} <= data.keys():
+                raise ValueError("Malformed cursor")
+            # The cursor goes straight into the seek predicate, so every part of it is checked here
+            if data["sort_by"] not in SORT_KEYS or data["sort_order"] not in ("asc", "desc"):
+                raise ValueError("Malformed cursor")
+            if not isinstance(data["id"], int) or isinstance(data["id"], bool) or not isinstance(data["value"], str):
+                raise ValueError("Malformed cursor")
+            if data["sort_by"] in TIME_SORT_KEYS:
+                try:
+                    datetime.fromisoformat(data["value"])
+                except ValueError:
+                    raise ValueError("Malformed cursor")
+        return value
+
 
 class EventUpdatePayload(BaseModel):
     title: Optional[str] = None
@@ -139,4 +169,5 @@ class EventVersionChangeLog(BaseModel):
 
 class EventChangelogResponse(BaseModel):
     event_id: int
-    changelog: List[EventVersionChangeLog]
\ No newline at end of file
+    changelog: List[EventVersionChangeLog]
+    next_cursor: Optional[str] = None  # set when `limit` cut the range short
\ No newline at end of file
@@ -1,2 +1,6 @@
 from .scraper import *
-from .poll_redis import *
\ No newline at end of file
+from .poll_redis import *
+from .purge_sessions import *
+from .backfill_snapshots import *
+from .compact_change_logs import *
+from .dispatcher import *
\ No newline at end of file
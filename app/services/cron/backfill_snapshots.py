@@ -0,0 +1,44 @@
+from app.core.config import EVENT_SNAPSHOT_INTERVAL
+from app.db.session import get_db
+from app.middleware.middleware import logger
+from app.repositories.event import get_event_infos_after, get_recurrence_by_event_id, get_event_snapshot_versions, \
+    create_event_snapshot
+from app.services.events import event_state_at_version
+
+
+def backfill_snapshots(batch_size: int = 100) -> int:
+    """
+    Writes the missing snapshots (every EVENT_SNAPSHOT_INTERVAL versions) for existing events.
+    Idempotent and committed per batch of events, so it can be stopped and rerun.
+    Run once after enabling snapshots: python -m app.services.cron.backfill_snapshots
+    """
+    db = next(get_db())
+    created, last_id = 0, 0
+    try:
+        while True:
+            batch = get_event_infos_after(db, last_id, batch_size, min_version=EVENT_SNAPSHOT_INTERVAL)
+            if not batch:
+                break
+            for event_info in batch:
+                recurrence = get_recurrence_by_event_id(db, event_info.id)
+                existing = get_event_snapshot_versions(db, event_info.id)
+                # Newest first, so each reconstruction starts from the snapshot written just before it
+                for version in range(event_info.version - event_info.version % EVENT_SNAPSHOT_INTERVAL, 0, -EVENT_SNAPSHOT_INTERVAL):
+                    if version not in existing:
+                        state = event_state_at_version(db, event_info, recurrence, version)
+                        create_event_snapshot(db, event_info.id, version, state)
+                        created += 1
+            db.commit()
+            last_id = batch[-1].id
+            logger.info(f"Snapshot backfill: {created} snapshots written, up to event {last_id}.")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"An error occurred while backfilling snapshots: {e}")
+        raise
+    finally:
+        db.close()
+    return created
+
+
+if __name__ == "__main__":
+    backfill_snapshots()
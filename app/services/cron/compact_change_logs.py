@@ -0,0 +1,58 @@
+from itertools import groupby
+from operator import attrgetter
+
+from app.core.config import BULK_INSERT_CHUNK_SIZE
+from app.db.session import get_db
+from app.middleware.middleware import logger
+from app.repositories.event import get_event_infos_after, get_change_logs_by_event, create_bulk_change_sets, \
+    delete_change_logs_up_to_version, lock_event_info
+
+
+def compact_change_logs(batch_size: int = 100) -> int:
+    """
+    Rewrites existing change_log rows as one change_set row per version and deletes the rows, committed
+    per batch of events, so it can be stopped and rerun. Returns the number of versions compacted.
+    Run after switching to CHANGE_LOG_FORMAT=compact: python -m app.services.cron.compact_change_logs
+    """
+    db = next(get_db())
+    compacted, last_id = 0, 0
+    try:
+        while True:
+            batch = get_event_infos_after(db, last_id, batch_size, min_version=2)
+            if not batch:
+                break
+            for event_info in batch:
+                # Held until the batch commits, so a rollback cannot delete and rewrite versions between the
+                # read and the delete below; it would leave change sets of versions that no longer exist
+                if lock_event_info(db, event_info.id) is None:
+                    continue
+                change_sets = []
+                for version, logs in groupby(get_change_logs_by_event(db, event_info.id), key=attrgetter("new_version_id")):
+                    logs = list(logs)
+                    change_sets.append({
+                        "event_id": event_info.id,
+                        "new_version_id": version,
+                        "changes": {log.field_name: (log.old_val, log.new_val) for log in logs},
+                        "changed_at": logs[0].changed_at,
+                    })
+                if not change_sets:
+                    continue
+                for start in range(0, len(change_sets), BULK_INSERT_CHUNK_SIZE):
+                    create_bulk_change_sets(db, change_sets[start:start + BULK_INSERT_CHUNK_SIZE])
+                # Only the versions read above: an update running meanwhile writes a newer version
+                delete_change_logs_up_to_version(db, event_info.id, change_sets[-1]["new_version_id"])
+                compacted += len(change_sets)
+            db.commit()
+            last_id = batch[-1].id
+            logger.info(f"Change log compaction: {compacted} versions compacted, up to event {last_id}.")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"An error occurred while compacting change logs: {e}")
+        raise
+    finally:
+        db.close()
+    return compacted
+
+
+if __name__ == "__main__":
+    compact_change_logs()
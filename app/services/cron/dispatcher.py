@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from app.core.config import async_redis_client, REDIS_EVENTS_ZSET, REDIS_DISPATCHER_WAKEUP, \
+    DISPATCHER_MAX_SLEEP_SECONDS, EVENT_TIMING_WHEEL, SCRAPER_WINDOW_MINUTES
+from app.core.event_queue import event_wheel, wheel_changed, load_wheel_from_redis
+from app.core.scheduler_metrics import record_tick
+from app.middleware.middleware import logger
+from app.services.cron.poll_redis import dispatch_due_members, dispatch_fired_members
+
+# BLPOP's smallest useful timeout; a member due sooner than this waits this long
+MIN_SLEEP_SECONDS = 0.01
+
+
+async def redis_step():
+    """Dispatches the due members, then sleeps on the wake-up list until the earliest remaining one is due."""
+    round_trips, claimed = await dispatch_due_members(time.time())
+    earliest = await async_redis_client.zrange(REDIS_EVENTS_ZSET, 0, 0, withscores=True)
+    round_trips += 1
+
+    delay = DISPATCHER_MAX_SLEEP_SECONDS
+    if earliest:
+        delay = min(delay, earliest[0][1] - time.time())
+    if delay > 0:
+        await async_redis_client.blpop([REDIS_DISPATCHER_WAKEUP], timeout=max(delay, MIN_SLEEP_SECONDS))
+        round_trips += 1
+    record_tick("dispatcher", round_trips=round_trips, members=claimed)
+
+
+async def wheel_step(next_sweep: float) -> float:
+    """
+    Dispatches what the timing wheel fired and, once next_sweep has passed, whatever else is due in Redis;
+    then sleeps until the wheel's next expiry, the next sweep or the scraper loading the wheel.
+    Returns the time of the next sweep.
+    """
+    wheel_changed.clear()
+    now = time.time()
+    round_trips, claimed = 0, 0
+    fired = event_wheel.advance(now)
+    if fired:
+        round_trips, claimed = await dispatch_fired_members(fired, now)
+    if now >= next_sweep:
+        # Backstop for members this wheel does not hold: scheduled or moved by another worker's scraper,
+        # beyond the wheel's horizon, or loaded before a crash
+        sweep_round_trips, swept = await dispatch_due_members(now)
+        round_trips += sweep_round_trips
+        claimed += swept
+        next_sweep = now + DISPATCHER_MAX_SLEEP_SECONDS
+    record_tick("dispatcher", round_trips=round_trips, members=claimed)
+
+    next_expiry = event_wheel.next_expiry()
+    delay = (next_sweep if next_expiry is None else min(next_sweep, next_expiry)) - time.time()
+    if delay > 0:
+        try:
+            await asyncio.wait_for(wheel_changed.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+    return next_sweep
+
+
+async def run_dispatcher():
+    """
+    Long-running replacement for the minute poll, dispatching members as they fall due.
+    With EVENT_TIMING_WHEEL the near-term members are fired from this worker's timing wheel, claimed in
+    Redis only when they fire, and Redis is swept every DISPATCHER_MAX_SLEEP_SECONDS for the rest.
+    Without it, each step reads the earliest member from Redis and sleeps until it is due on a BLPOP of the
+    wake-up list, which the scraper ends early when it schedules something.
+    """
+    logger.info("Event dispatcher started.")
+    next_sweep = 0.0
+    loaded = not EVENT_TIMING_WHEEL
+    while True:
+        try:
+            if not loaded:
+                # The wheel starts empty, also after a crash; Redis still holds every scheduled member
+                count = await load_wheel_from_redis(time.time() + SCRAPER_WINDOW_MINUTES * 60)
+                loaded = True
+                logger.info(f"Loaded {count} members from Redis into the timing wheel.")
+            if EVENT_TIMING_WHEEL:
+                next_sweep = await wheel_step(next_sweep)
+            else:
+                await redis_step()
+        except asyncio.CancelledError:
+            logger.info("Event dispatcher stopped.")
+            raise
+        except Exception as e:
+            logger.error(f"Error occurred in the event dispatcher: {e}")
+            await asyncio.sleep(1)
@@ -1,9 +1,51 @@
+import asyncio
 import datetime
-from app.core.config import redis_client, REDIS_EVENTS_ZSET
+import time
+from app.core.config import POLLER_CLAIM_BATCH_SIZE
+from app.core.event_queue import claim_due_members, claim_members
 from app.core.kafka_config import send_notification
+from app.core.scheduler_metrics import record_tick, observe_dispatch_lag
 from app.middleware.middleware import logger
 
 
+async def dispatch_due_members(now: float) -> tuple[int, int]:
+    """
+    Claims members due by now in bounded atomic batches: every member goes to exactly one poller, so
+    instances share the due work instead of each publishing all of it. Each batch is published
+    concurrently. Returns (Redis round-trips, members dispatched).
+    """
+    round_trips, claimed = 0, 0
+    while True:
+        batch = await claim_due_members(now, POLLER_CLAIM_BATCH_SIZE)
+        round_trips += 1
+        claimed += len(batch)
+        await asyncio.gather(*(dispatch_member(member, due_at) for member, due_at in batch))
+        if len(batch) < POLLER_CLAIM_BATCH_SIZE:
+            return round_trips, claimed
+
+
+async def dispatch_fired_members(fired: list[tuple[str, float]], now: float) -> tuple[int, int]:
+    """
+    Dispatches members fired by the timing wheel. Each batch is claimed in Redis first, and only if still due
+    by now, so a member also held by another worker's wheel, already swept as due, unscheduled or moved to a
+    later time since it was loaded is skipped. Returns (Redis round-trips, members dispatched).
+    """
+    members = [member for member, _ in fired]
+    round_trips, claimed = 0, 0
+    for start in range(0, len(members), POLLER_CLAIM_BATCH_SIZE):
+        batch = await claim_members(members[start:start + POLLER_CLAIM_BATCH_SIZE], now)
+        round_trips += 1
+        claimed += len(batch)
+        await asyncio.gather(*(dispatch_member(member, due_at) for member, due_at in batch))
+    return round_trips, claimed
+
+
+async def dispatch_member(member: bytes, due_at: float):
+    event_id, event_type = member.decode().split(":")
+    await handle_event(int(event_id), event_type)
+    observe_dispatch_lag(time.time() - due_at)
+
+
 async def poll_redis():
     """Poll Redis to check if the current timestamp >= event timestamps.
     If the condition is met, remove the event and trigger another function."""
@@ -12,24 +54,13 @@ async def poll_redis():
         # Get the current UTC time
         current_timestamp = datetime.datetime.now(datetime.timezone.utc).timestamp()
 
-        # Get the events from Redis sorted set where the score is less than or equal to the current timestamp
-        events_to_process = redis_client.zrangebyscore(REDIS_EVENTS_ZSET, '-inf', current_timestamp)
+        round_trips, claimed = await dispatch_due_members(current_timestamp)
+        record_tick("poll_redis", round_trips=round_trips, members=claimed)
 
-        if not events_to_process:
+        if not claimed:
             logger.info("No events to process. Nothing to remove.")
             return
-
-        for event in events_to_process:
-            event_id, event_type = event.decode().split(":")
-            event_id = int(event_id)  # Get the event ID from the Redis key
-            # Remove the event from Redis
-            redis_client.zrem(REDIS_EVENTS_ZSET, event)
-
-            # Log the event removal
-            logger.info(f"Event {event_id} with type {event_type} removed from Redis.")
-
-            # Call another function here
-            await handle_event(event_id, event_type)
+        logger.info(f"Claimed and handled {claimed} due members from Redis.")
 
     except Exception as e:
         logger.error(f"Error occurred while polling Redis: {e}")
@@ -53,7 +84,7 @@ async def handle_event(event_id: int, event_type: str):
     else:
         topic = "send_notif"  # Default topic,
 
-    # Publish the message to the respective Kafka topic
-    send_notification(topic, message)
+    # Publish the message to the respective Kafka topic, off the event loop since the producer blocks on the ack
+    await asyncio.to_thread(send_notification, topic, message)
 
     logger.info(f"Message published to topic '{topic}' for event {event_id}.")
@@ -0,0 +1,15 @@
+from app.db.session import get_db
+from app.middleware.middleware import logger
+from app.repositories.auth import purge_expired_sessions
+
+
+def purge_sessions():
+    """Delete expired rows from active_sessions. Runs in the scheduler's thread pool."""
+    db = next(get_db())
+    try:
+        deleted = purge_expired_sessions(db)
+        logger.info(f"Purged {deleted} expired sessions.")
+    except Exception as e:
+        logger.error(f"An error occurred while purging sessions: {e}")
+    finally:
+        db.close()
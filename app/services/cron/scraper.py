@@ -1,54 +1,95 @@
 import datetime
-from fastapi.params import Depends
-from sqlalchemy.orm import Session
-from app.db.models import Event
-from app.core.config import redis_client, REDIS_EVENTS_ZSET  # Redis client
-from app.db.session import get_db
+import json
+
+from app.core.config import async_redis_client, REDIS_EVENTS_ZSET, REDIS_SCRAPER_WATERMARK, SCRAPER_WINDOW_MINUTES, \
+    SCRAPER_WATERMARK_OVERLAP_SECONDS, REDIS_PIPELINE_CHUNK_SIZE, REDIS_DISPATCHER_WAKEUP, EVENT_DISPATCHER, \
+    EVENT_TIMING_WHEEL
+from app.core.event_queue import load_wheel
+from app.core.scheduler_metrics import record_tick
+from app.db.session import AsyncSessionLocal
 from app.middleware.middleware import logger
+from app.repositories.event.aio import get_event_times_starting_between, get_event_times_updated_since
+from app.utils import EventStatus, schedule_members
+
+
+async def load_watermark() -> dict | None:
+    raw = await async_redis_client.get(REDIS_SCRAPER_WATERMARK)
+    return json.loads(raw) if raw else None
+
+
+def plan_schedule(occurrences, now: float, window_end: float) -> tuple[dict, set]:
+    """
+    Splits occurrences into members to add (member -> score) and stale members to remove.
+    A scheduled occurrence in the window gets its start and end; one that already started keeps only its
+    end, which is left as is; cancelled, completed or moved out of the window loses both.
+    """
+    to_add, to_remove = {}, set()
+    for occurrence_id, start_time, end_time, status in occurrences:
+        start_member, end_member = schedule_members(occurrence_id)
+        start, end = start_time.timestamp(), end_time.timestamp()
+        if status == EventStatus.SCHEDULED and start <= window_end:
+            # A start already due is left to the poller, as the full window scan never re-added it
+            if start >= now:
+                to_add[start_member] = start
+                to_add[end_member] = end
+        elif status == EventStatus.ACTIVE and start <= window_end:
+            to_remove.add(start_member)
+        else:
+            to_remove.update((start_member, end_member))
+    return to_add, to_remove
+
 
 async def scrape_events():
-    """Scrape events from the database that are within the current and next cron window,
-    and add them to Redis sorted set."""
-    db=next(get_db())
+    """
+    Incrementally schedules event occurrences in the Redis sorted set. Each run reads only the occurrences
+    that entered the window since the previous run and the ones created or changed since then, tracked by a
+    watermark kept in Redis; without a watermark the whole window is scanned once.
+    """
     try:
-        # Define the current time (UTC) and the next cron window (10 minutes ahead)
         now = datetime.datetime.now(datetime.timezone.utc)
-        next_cron_time = now + datetime.timedelta(minutes=10)  # Next 10 minutes
-
-        # Query the database for events whose start_time is within the cron window
-        events_in_window = db.query(Event).filter(
-            Event.start_time >= now,
-            Event.start_time <= next_cron_time
-        ).all()
-
-        # If there are no events, log and return
-        if not events_in_window:
-            logger.info("No events found for the current cron window.")
-            return
-
-        # Define a polling timestamp to track the next cron window
-        polling_timestamp = next_cron_time.timestamp()
-
-        # Add events to Redis sorted set
-        for event in events_in_window:
-            start_timestamp = event.start_time.timestamp()
-            end_timestamp = event.end_time.timestamp()
-
-            # Add event start and end times to the Redis sorted set
-            redis_client.zadd(
-                REDIS_EVENTS_ZSET,
-                {f"{event.id}:start": start_timestamp}
-            )
-            redis_client.zadd(
-                REDIS_EVENTS_ZSET,
-                {f"{event.id}:end": end_timestamp}
-            )
+        window_end = now + datetime.timedelta(minutes=SCRAPER_WINDOW_MINUTES)
+        watermark = await load_watermark()
 
-        # Log that the scraping has completed
-        logger.info(f"Scraped and added {len(events_in_window)} events to Redis.")
+        async with AsyncSessionLocal() as db:
+            if watermark is None:
+                occurrences = await get_event_times_starting_between(db, now, window_end)
+            else:
+                scheduled_until = datetime.datetime.fromtimestamp(watermark["window_end"], datetime.timezone.utc)
+                changed_since = datetime.datetime.fromtimestamp(watermark["updated_at"], datetime.timezone.utc)
+                entered = await get_event_times_starting_between(db, max(scheduled_until, now), window_end)
+                changed = await get_event_times_updated_since(
+                    db, changed_since - datetime.timedelta(seconds=SCRAPER_WATERMARK_OVERLAP_SECONDS)
+                )
+                occurrences = entered + changed
+
+        to_add, to_remove = plan_schedule(occurrences, now.timestamp(), window_end.timestamp())
+        added, stale = list(to_add.items()), list(to_remove)
+        # One round-trip for the whole run: chunked ZADD/ZREM and the new watermark in one MULTI/EXEC, so the
+        # watermark only advances together with the changes and the poller never sees half of them
+        async with async_redis_client.pipeline(transaction=True) as pipe:
+            for start in range(0, len(added), REDIS_PIPELINE_CHUNK_SIZE):
+                pipe.zadd(REDIS_EVENTS_ZSET, dict(added[start:start + REDIS_PIPELINE_CHUNK_SIZE]))
+            for start in range(0, len(stale), REDIS_PIPELINE_CHUNK_SIZE):
+                pipe.zrem(REDIS_EVENTS_ZSET, *stale[start:start + REDIS_PIPELINE_CHUNK_SIZE])
+            if added:
+                # Wakes a sleeping dispatcher, which re-reads the earliest due member; one pending token is enough
+                pipe.lpush(REDIS_DISPATCHER_WAKEUP, 1)
+                pipe.ltrim(REDIS_DISPATCHER_WAKEUP, 0, 0)
+            pipe.set(
+                REDIS_SCRAPER_WATERMARK, json.dumps({"window_end": window_end.timestamp(), "updated_at": now.timestamp()})
+            )
+            await pipe.execute()
+        record_tick("scrape_events", round_trips=2, members=len(added) + len(stale))  # watermark read + pipeline
+        if EVENT_DISPATCHER and EVENT_TIMING_WHEEL:
+            # After the pipeline, so every member in the wheel is also durable in Redis
+            load_wheel(to_add, to_remove)
+        logger.info(
+            f"Scraper read {len(occurrences)} occurrences{' (full window)' if watermark is None else ''}: "
+            f"{len(to_add)} members added, {len(to_remove)} removed."
+        )
 
         # Return the polling timestamp for future checks
-        return polling_timestamp
+        return window_end.timestamp()
 
     except Exception as e:
         logger.error(f"An error occurred while scraping events: {e}")
@@ -1,81 +1,204 @@
-from collections import defaultdict
+import json
 from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
 
 from fastapi import HTTPException
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.core.config import BULK_INSERT_CHUNK_SIZE, EVENT_SNAPSHOT_INTERVAL, EVENT_UPDATE_MAX_ATTEMPTS, \
+    CHANGE_LOG_FORMAT, REDIS_EVENTS_ZSET, redis_client
+from app.core.event_cache import get_cached_event, cache_event, invalidate_cached_event
+from app.core.history_cache import history_cache
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.middleware.middleware import logger
 from app.repositories import event as event_repo
 from app.repositories.event import *
-from app.repositories.event.change_log import get_change_logs_by_version
+from app.repositories.event.aio import stream_change_logs_in_version_range
+from app.repositories.event.change_log import get_change_logs_in_version_range, get_version_change_id
 
 from app.schemas.api import events
 from app.schemas.api.events import *
 from app.services.events import validate_event_update_conditions, validate_duration_against_recurrence
-from app.utils import AccessLevel, parse_typed_value, cast_value, get_interval_seconds
+from app.utils import AccessLevel, parse_typed_value, cast_value, get_interval_seconds, RecurrencePattern, \
+    schedule_members
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.concurrency import run_blocking
 
 
 def create_event_service(
     payload: events.EventCreate, db: Session,user_id: int
 ) -> tuple[EventInfo, Event]:
+    # Unit of work: the repository calls only flush, so the event and its rows are committed once, together
+    try:
+        # 1. Insert into event_info
+        event_info_obj = create_event_info(
+            db,
+            EventInfoCreate(
+                title=payload.title, desc=payload.description, location=payload.location
+            ),
+        )  # gets event_info.id before commit
 
-    # 1. Insert into event_info
-    event_info_obj = create_event_info(
-        db,
-        EventInfoCreate(
-            title=payload.title, desc=payload.description, location=payload.location
-        ),
-    )  # gets event_info.id before commit
-
-    # 2. Insert into events
-    event_obj = create_event(
-        db,
-        EventCreateInternal(
-            event_id=event_info_obj.id,
-            start_time=payload.start_time,
-            end_time=payload.end_time,
-        ),
-    )
-
-    # 3. Insert into event_access
-    access = create_event_access(
-        db,
-        EventAccessCreate(
-            user_id=user_id,
-            event_id=event_info_obj.id,
-            access=AccessLevel.OWNER,
-        ),
-    )
+        # 2. Insert into events
+        event_obj = create_event(
+            db,
+            EventCreateInternal(
+                event_id=event_info_obj.id,
+                start_time=payload.start_time,
+                end_time=payload.end_time,
+            ),
+        )
 
-    # 4. Optional: handle recurrence
-    if payload.is_recurring and payload.recurrence_pattern:
-        recurrence = create_recurrence(
+        # 3. Insert into event_access
+        access = create_event_access(
             db,
-            RecurrenceCreate(
+            EventAccessCreate(
+                user_id=user_id,
                 event_id=event_info_obj.id,
-                pattern=payload.recurrence_pattern,
-                duration=int((payload.end_time - payload.start_time).total_seconds()),
+                access=AccessLevel.OWNER,
             ),
         )
 
-    return event_info_obj, event_obj
+        # 4. Optional: handle recurrence
+        if payload.is_recurring and payload.recurrence_pattern:
+            recurrence = create_recurrence(
+                db,
+                RecurrenceCreate(
+                    event_id=event_info_obj.id,
+                    pattern=payload.recurrence_pattern,
+                    duration=int((payload.end_time - payload.start_time).total_seconds()),
+                ),
+            )
 
-def share_event_service(db: Session, event_id: int, payload: ShareEventPayload):
-    shared_entries = []
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
-    for user in payload.users:
-        existing_access = get_access_by_user_and_event(db, user_id=user.user_id, event_id=event_id)
+    return event_info_obj, event_obj
 
-        if existing_access:
-            updated_access = update_event_access(db, existing_access, user.role)
-            shared_entries.append(EventAccessResponse(user_id=updated_access.user_id, access=updated_access.access))
-        else:
-            new_access = create_event_access(
-                db,
-                EventAccessCreate(user_id=user.user_id, event_id=event_id, access=user.role)
+def create_events_batch_service(
+    payloads: list[events.EventCreate], db: Session, user_id: int, chunk_size: int = BULK_INSERT_CHUNK_SIZE
+) -> list[EventResponse]:
+    """
+    Creates the events with multi-row INSERTs, one transaction per chunk of `chunk_size` events.
+    Payloads must already be validated. Responses are returned in input order.
+    """
+    responses = []
+    for start in range(0, len(payloads), chunk_size):
+        chunk = payloads[start:start + chunk_size]
+        try:
+            event_ids = bulk_create_event_infos(db, [
+                {"title": p.title, "description": p.description, "location": p.location} for p in chunk
+            ])
+            bulk_create_events(db, [
+                {"event_id": event_id, "start_time": p.start_time, "end_time": p.end_time}
+                for event_id, p in zip(event_ids, chunk)
+            ])
+            bulk_create_event_accesses(db, [
+                {"user_id": user_id, "event_id": event_id, "access": AccessLevel.OWNER} for event_id in event_ids
+            ])
+            bulk_create_recurrences(db, [
+                {
+                    "event_id": event_id,
+                    "hour": p.recurrence_pattern.hour,
+                    "day": p.recurrence_pattern.day,
+                    "month": p.recurrence_pattern.month,
+                    "year": p.recurrence_pattern.year,
+                    "duration": int((p.end_time - p.start_time).total_seconds()),
+                }
+                for event_id, p in zip(event_ids, chunk) if p.is_recurring and p.recurrence_pattern
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # Built from the payload instead of re-reading the rows; DATETIME columns drop the offset
+        responses.extend(
+            EventResponse(
+                id=event_id,
+                title=p.title,
+                description=p.description,
+                location=p.location,
+                start_time=p.start_time.replace(tzinfo=None),
+                end_time=p.end_time.replace(tzinfo=None),
             )
-            shared_entries.append(EventAccessResponse(user_id=new_access.user_id, access=new_access.access))
+            for event_id, p in zip(event_ids, chunk)
+        )
+    return responses
+
+def event_tag(probe) -> tuple:
+    """Identifies the event's current state from a get_event_cache_tag row."""
+    return probe.version, probe.occurrence_id, probe.status, probe.last_change_id, probe.last_change_set_id
+
+def get_event_service(db: Session, user_id: int, event_id: int, probe=None) -> tuple[EventResponseWithAccess, tuple]:
+    """
+    Returns the event and its tag. One round-trip either way: a cached event is revalidated with
+    the tag probe (or the `probe` row the caller already loaded), otherwise the joined query loads
+    everything. Only a stale cache entry costs both.
+    """
+    cached = get_cached_event(event_id)
+    if cached:
+        probe = probe or get_event_cache_tag(db, user_id, event_id)
+        if not probe:
+            raise HTTPException(status_code=403, detail="You do not have permission to view this event.")
+        tag = event_tag(probe)
+        cached_tag, cached_response = cached
+        if cached_tag == tag:
+            return cached_response.model_copy(update={"access": probe.access}), tag
+
+    row = get_event_with_access(db, user_id, event_id)
+    if not row:
+        raise HTTPException(status_code=403, detail="You do not have permission to view this event.")
+
+    access_entry, event_info, event, recurrence, last_change_id, last_change_set_id = row
+    if not event_info or not event:
+        raise HTTPException(status_code=404, detail="Event not found.")
+
+    response = EventResponseWithAccess(
+        id=event_info.id,
+        title=event_info.title,
+        description=event_info.description,
+        location=event_info.location,
+        start_time=event.start_time,
+        end_time=event.end_time,
+        access=access_entry.access,
+        status=event.status,
+        version=event_info.version,
+        recurrence_pattern=RecurrencePattern(
+            hour=recurrence.hour,
+            day=recurrence.day,
+            year=recurrence.year,
+            month=recurrence.month
+        ) if recurrence else None
+    )
+    tag = (event_info.version, event.id, event.status, last_change_id, last_change_set_id)
+    cache_event(event_id, tag, response)
+    return response, tag
+
+def share_event_service(db: Session, event_id: int, payload: ShareEventPayload, owner_id: int):
+    """
+    Validates the users and grants the roles with one read and one multi-row upsert, in a single transaction.
+    """
+    user_ids = [user.user_id for user in payload.users]
+    current_access = get_users_event_access(db, event_id, user_ids)
+    if len(current_access) != len(user_ids):  # unknown or repeated user ids
+        raise HTTPException(status_code=400, detail="Invalid User_ID provided. Please check again")
+    if owner_id in current_access:
+        raise HTTPException(status_code=403, detail="You cannot share this event with yourself.")
+
+    # Users who already hold the requested role need no write
+    grants = {user.user_id: user.role for user in payload.users if current_access[user.user_id] != user.role}
+    try:
+        upsert_event_accesses(db, event_id, grants)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_cached_event(event_id)
 
-    return shared_entries
+    return [EventAccessResponse(user_id=user.user_id, access=user.role) for user in payload.users]
 
 
 
@@ -143,6 +266,18 @@ def update_recurrence(
 
 
 def update_event_details_service(event_id: int, payload: EventUpdatePayload, db: Session) -> (dict,int):
+    """
+    Writes the new version, its change log and snapshot in one transaction. A writer that loses the
+    optimistic lock on EventInfo.version re-reads the event and retries, then gets a 409.
+    """
+    for attempt in range(1, EVENT_UPDATE_MAX_ATTEMPTS + 1):
+        try:
+            return apply_event_details_update(event_id, payload, db)
+        except StaleDataError:
+            logger.warning(f"Concurrent update of event {event_id}, attempt {attempt} of {EVENT_UPDATE_MAX_ATTEMPTS}")
+    raise HTTPException(status_code=409, detail="Event was modified concurrently, please retry.")
+
+def apply_event_details_update(event_id: int, payload: EventUpdatePayload, db: Session) -> (dict,int):
     updated_fields = {}  # Dictionary to hold old_value, new_value pairs for updated fields
     try:
         event_info = event_repo.get_event_info_by_id(db, event_id)
@@ -154,17 +289,25 @@ def update_event_details_service(event_id: int, payload: EventUpdatePayload, db:
 
         event_repo.save_event_info(db, event_info)
         # event_repo.save_event(db, event)
+        db.flush()  # the version check runs here and the row stays locked until commit
 
         recurrence = event_repo.get_recurrence_by_event_id(db, event_id)
         if payload.recurrence is not None:
             update_recurrence(db, event_id, recurrence, payload, event,updated_fields)
         if recurrence:
             validate_duration_against_recurrence(event, recurrence)
+        if not updated_fields:
+            raise HTTPException(status_code=500, detail="Failed to update event")
+
+        populate_change_log(db, updated_fields, event_info.version, event_id)
+        if event_info.version % EVENT_SNAPSHOT_INTERVAL == 0:
+            create_event_snapshot(db, event_id, event_info.version, event_state(event_info, recurrence))
 
         db.commit()
+        invalidate_cached_event(event_id)
         return updated_fields,event_info.version
 
-    except HTTPException:
+    except (HTTPException, StaleDataError):
         db.rollback()
         raise
     except Exception as e:
@@ -172,71 +315,59 @@ def update_event_details_service(event_id: int, payload: EventUpdatePayload, db:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 def populate_change_log(db: Session, updated_fields: dict, version: int,event_id:int) -> bool:
-    try:
-        # Loop over each updated field in the dictionary
-        for field_name, (old_val, new_val) in updated_fields.items():
-            # Create a new ChangeLog entry for each updated field
-            change_log_entry = ChangeLog(
-                event_id=event_id,  # Use the event_id (or another identifier) here
-                new_version_id=version,  # Assuming new_version_id is the same as version
-                field_name=field_name,
-                old_val=old_val,  # The old value of the field
-                new_val=new_val   # The new value of the field
-            )
-
-            # Add the change log entry to the session
-            db.add(change_log_entry)
-
-        # Commit the transaction to save the entries in the database
-        db.commit()
-
-        # Return True indicating success
+    """Writes the version's changes with a single INSERT, in the CHANGE_LOG_FORMAT layout. The caller commits."""
+    if CHANGE_LOG_FORMAT == "compact":
+        create_bulk_change_sets(db, [{"event_id": event_id, "new_version_id": version, "changes": updated_fields}])
         return True
+    create_bulk_change_logs(db, [
+        {
+            "event_id": event_id,
+            "new_version_id": version,
+            "field_name": field_name,
+            "old_val": old_val,
+            "new_val": new_val,
+        }
+        for field_name, (old_val, new_val) in updated_fields.items()
+    ])
+    return True
 
+def unschedule_occurrences(occurrence_ids: list[int]):
+    """Removes deleted occurrences from the scheduler's sorted set; the scraper cannot see deleted rows."""
+    if not occurrence_ids:
+        return
+    try:
+        members = [member for occurrence_id in occurrence_ids for member in schedule_members(occurrence_id)]
+        run_blocking(redis_client.zrem, REDIS_EVENTS_ZSET, *members)
     except Exception as e:
-        # Rollback the session in case of any errors
-        db.rollback()
-        # Log the error for debugging purposes
-        raise Exception(f"Error populating change log: {str(e)}")
+        logger.error(f"Failed to unschedule occurrences {occurrence_ids}: {e}")
 
-def delete_event_by_id(db: Session, event_id: int) -> bool:
+def delete_event_by_id(db: Session, event_id: int) -> dict[str, int] | None:
+    """
+    Deletes the event with one DELETE per table, children first, in a single transaction.
+    Returns the rows removed per table, or None if the delete failed.
+    """
     try:
-        # 1. Delete ChangeLogs
-        change_logs = get_change_logs_by_event(db, event_id)
-        for change_log in change_logs:
-            db.delete(change_log)
-
-
-        # 2. Delete EventAccess
-        accesses = get_accesses_by_event(db, event_id)
-        for access in accesses:
-            db.delete(access)
-
-
-        # 3. Delete Events
-        events = db.query(Event).filter(Event.event_id == event_id).all()
-        for event in events:
-            db.delete(event)
-
-
-        # 4. Delete Recurrence (if any)
-        recurrence = get_recurrence_by_event_id(db, event_id)
-        if recurrence:
-            db.delete(recurrence)
-        db.commit()  # Stage 4
-
-        # 5. Finally, delete EventInfo
-        event_info = get_event_info_by_id(db, event_id)
-        if event_info:
-            db.delete(event_info)
-        db.commit()  # Stage 5
-
-        return True
-
+        occurrence_ids = get_event_ids_by_event_id(db, event_id)
+        deleted = {
+            "change_log": delete_change_logs_by_event(db, event_id),
+            "change_set": delete_change_sets_by_event(db, event_id),
+            "event_snapshot": delete_event_snapshots_from_version_onwards(db, event_id, 0),
+            "event_access": delete_accesses_by_event(db, event_id),
+            "events": delete_events_by_event_id(db, event_id),
+            "recurrence": delete_recurrence_by_event_id(db, event_id),
+            "event_info": delete_event_info(db, event_id),
+        }
+        db.commit()
     except Exception as e:
         logger.error(f"Error deleting event info: {str(e)}")
         db.rollback()
-        return False
+        return None
+
+    invalidate_cached_event(event_id)
+    history_cache.invalidate_event(event_id)
+    unschedule_occurrences(occurrence_ids)
+    logger.info(f"Deleted event {event_id}: " + ", ".join(f"{table}={count}" for table, count in deleted.items()))
+    return deleted
 
 
 
@@ -247,29 +378,137 @@ def delete_event_permission(db: Session, event_id: int, user_id: int) -> bool:
 
     db.delete(permission)
     db.commit()
+    invalidate_cached_event(event_id)
     return True
 
 def get_difference(
     db: Session, event_id: int, from_version: int, to_version: int
 ) -> dict:
     difference = {}
+    if to_version <= from_version:
+        return difference
+
+    # One ordered range query instead of one query per version; the first change of a field keeps
+    # its old value and every later change overwrites the new one
+    for _, field, old_val, new_val in get_change_logs_in_version_range(db, event_id, from_version + 1, to_version):
+        old_val = str(old_val) if old_val is not None else None
+        new_val = str(new_val) if new_val is not None else None
+
+        if field in difference:
+            # Update only the new_val
+            difference[field][1] = new_val
+        else:
+            # First time the field is seen
+            difference[field] = [old_val, new_val]
 
-    for version in range(from_version + 1, to_version + 1):
-        logs = get_change_logs_by_version(db, event_id, version)
+    return difference
 
-        for log in logs:
-            field = log.field_name
-            old_val = str(log.old_val) if log.old_val is not None else None
-            new_val = str(log.new_val) if log.new_val is not None else None
+def event_state(source, recurrence=None) -> dict:
+    """Versioned fields of an event, from EventInfo (+ Recurrence) or from an EventSnapshot."""
+    if isinstance(source, EventSnapshot):
+        return {
+            "title": source.title,
+            "description": source.description,
+            "location": source.location,
+            "recurrence_hour": source.recurrence_hour,
+            "recurrence_day": source.recurrence_day,
+            "recurrence_month": source.recurrence_month,
+            "recurrence_year": source.recurrence_year,
+        }
+    return {
+        "title": source.title,
+        "description": source.description,
+        "location": source.location,
+        "recurrence_hour": recurrence.hour if recurrence else 0,
+        "recurrence_day": recurrence.day if recurrence else 0,
+        "recurrence_month": recurrence.month if recurrence else 0,
+        "recurrence_year": recurrence.year if recurrence else 0,
+    }
 
-            if field in difference:
-                # Update only the new_val
-                difference[field][1] = new_val
-            else:
-                # First time the field is seen
-                difference[field] = [old_val, new_val]
+def event_state_at_version(db: Session, event_info: EventInfo, recurrence: Recurrence | None, version_id: int) -> dict:
+    """
+    Starts from whichever full state is closest to version_id, the current row or the nearest snapshot,
+    and replays the change sets in between: backward with old values, forward with new values.
+    """
+    base, start_version = event_state(event_info, recurrence), event_info.version
+    snapshot = get_nearest_event_snapshot(db, event_info.id, version_id)
+    if snapshot and abs(snapshot.version - version_id) < abs(start_version - version_id):
+        base, start_version = event_state(snapshot), snapshot.version
+
+    if start_version > version_id:
+        for field, (old_val, _) in get_difference(db, event_info.id, version_id, start_version).items():
+            base[field] = parse_typed_value(field, old_val)
+    elif start_version < version_id:
+        to_version = min(version_id, event_info.version)
+        for field, (_, new_val) in get_difference(db, event_info.id, start_version, to_version).items():
+            base[field] = parse_typed_value(field, new_val)
+    return base
+
+def _version_state(event_id: int, version_id: int, state: dict) -> dict:
+    return {
+        "id": event_id,
+        "title": state["title"],
+        "description": state["description"],
+        "location": state["location"],
+        "version": version_id,
+        "recurrence": {
+            "hour": state["recurrence_hour"],
+            "day": state["recurrence_day"],
+            "month": state["recurrence_month"],
+            "year": state["recurrence_year"],
+        }
+    }
 
-    return difference
+def _timeline_start(db: Session, event_id: int, from_version: int) -> dict:
+    event_info = get_event_info_by_id(db, event_id)
+    recurrence = get_recurrence_by_event_id(db, event_id)
+    return event_state_at_version(db, event_info, recurrence, from_version)
+
+def _timeline_line(event_id: int, version_id: int, state: dict) -> str:
+    return json.dumps(_version_state(event_id, version_id, state), default=str) + "\n"
+
+def stream_event_timeline(event_id: int, from_version: int, to_version: int):
+    """
+    Yields the full state at every version from from_version to to_version as NDJSON lines. The state at
+    from_version is reconstructed once, then the change log is streamed forward and applied version by version.
+    Opens its own session: the body is streamed after the request's session has been closed.
+    """
+    db = SessionLocal()
+    try:
+        state = _timeline_start(db, event_id, from_version)
+        yield _timeline_line(event_id, from_version, state)
+
+        next_version = from_version + 1
+        for version_id, field, _, new_val in get_change_logs_in_version_range(db, event_id, next_version, to_version):
+            # The first change of a version means every earlier version is complete
+            while next_version < version_id:
+                yield _timeline_line(event_id, next_version, state)
+                next_version += 1
+            state[field] = parse_typed_value(field, new_val)
+
+        while next_version <= to_version:
+            yield _timeline_line(event_id, next_version, state)
+            next_version += 1
+    finally:
+        db.close()
+
+async def stream_event_timeline_async(event_id: int, from_version: int, to_version: int):
+    """stream_event_timeline for DB_MODE=async: its own AsyncSession, the change log read through the async driver."""
+    async with AsyncSessionLocal() as db:
+        state = await db.run_sync(_timeline_start, event_id, from_version)
+        yield _timeline_line(event_id, from_version, state)
+
+        next_version = from_version + 1
+        changes = stream_change_logs_in_version_range(db, event_id, next_version, to_version)
+        async for version_id, field, _, new_val in changes:
+            while next_version < version_id:
+                yield _timeline_line(event_id, next_version, state)
+                next_version += 1
+            state[field] = parse_typed_value(field, new_val)
+
+        while next_version <= to_version:
+            yield _timeline_line(event_id, next_version, state)
+            next_version += 1
 
 def reconstruct_event_version(
     db: Session, event_id: int, version_id: int
@@ -280,91 +519,145 @@ def reconstruct_event_version(
     if not event_info:
         raise HTTPException(status_code=404, detail="Event not found.")
 
-    # Step 2: Turn current values into a mutable dict
-    base = {
-        "id": event_info.id,
-        "title": event_info.title,
-        "description": event_info.description,
-        "location": event_info.location,
-        "version": version_id,
-        "recurrence_hour": recurrence.hour if recurrence else 0,
-        "recurrence_day": recurrence.day if recurrence else 0,
-        "recurrence_month": recurrence.month if recurrence else 0,
-        "recurrence_year": recurrence.year if recurrence else 0,
-    }
-
-    # Step 2: Apply cumulative changes
-    diff = get_difference(db, event_id=event_info.id, from_version=version_id, to_version=event_info.version)
-
-    for field, (old_val, _) in diff.items():
-        base[field] = parse_typed_value(field, old_val)
+    # Step 2: Replay from the closest full state
+    base = event_state_at_version(db, event_info, recurrence, version_id)
 
     # Step 3: Post-process to get the final structured format
-    reconstructed = {
-        "id": base["id"],
-        "title": base["title"],
-        "description": base["description"],
-        "location": base["location"],
-        "version": base["version"],
-        "recurrence": {
-            "hour": base.get("recurrence_hour", 0),
-            "day": base.get("recurrence_day", 0),
-            "month": base.get("recurrence_month", 0),
-            "year": base.get("recurrence_year", 0),
-        }
-    }
+    reconstructed = _version_state(event_info.id, version_id, base)
 
     return reconstructed
 
 
-def rollback_event_to_version_service(
-    db: Session,
-    event_id: int,
-    target_version: int,
-    current_version: int
-):
-    difference = get_difference(db, event_id, from_version=target_version, to_version=current_version)
+def get_event_version_service(db: Session, event_id: int, version_id: int, current_version: int) -> dict:
+    """reconstruct_event_version, served from the history cache for versions that already exist."""
+    if version_id > current_version:
+        return reconstruct_event_version(db, event_id, version_id)
 
-    event_info = get_event_info_by_id(db, event_id)
-    recurrence = get_recurrence_by_event_id(db, event_id)
+    key, token = ("version", version_id), get_version_change_id(db, event_id, version_id)
+    reconstructed = history_cache.get(event_id, key, token)
+    if reconstructed is None:
+        reconstructed = reconstruct_event_version(db, event_id, version_id)
+        history_cache.set(event_id, key, token, reconstructed)
+    return reconstructed
 
-    #Loop through fields in dict, check which entities have the field, update the field and break for that field
-    for field, (old_val, _) in difference.items():
-        for entity in (event_info, recurrence):
-            if entity and hasattr(entity, field):
-                current_val = getattr(entity, field)
-                casted_val = cast_value(type(current_val), old_val)
-                setattr(entity, field, casted_val)
-                break
-    delete_change_logs_from_version_onwards(db, event_id, target_version+1)
-    event_info.version = target_version
-
-    event_repo.save_event_info(db, event_info)
-    if recurrence:
-        event_repo.save_recurrence(db, recurrence)
+def get_difference_service(db: Session, event_id: int, from_version: int, to_version: int, current_version: int) -> dict:
+    """get_difference, served from the history cache when to_version already exists."""
+    if to_version > current_version:
+        return get_difference(db, event_id, from_version, to_version)
 
-    db.commit()
+    key, token = ("diff", from_version, to_version), get_version_change_id(db, event_id, to_version)
+    difference = history_cache.get(event_id, key, token)
+    if difference is None:
+        difference = get_difference(db, event_id, from_version, to_version)
+        history_cache.set(event_id, key, token, difference)
+    return difference
 
-#For chronological ordering of logs
-def get_event_changelog(db: Session, event_id: int) -> EventChangelogResponse:
-    logs = get_change_logs_by_event(db, event_id)
+def rollback_event_to_version_service(db: Session, event_id: int, target_version: int):
+    """
+    Undoes every version after target_version. The event is locked and re-read first, so versions committed
+    after the caller checked it are undone too; a writer that still gets past the version check causes a 409.
+    """
+    try:
+        # Locked before the history is read or deleted, in the same order as the change log compaction
+        event_info = lock_event_info(db, event_id)
+        if not event_info:
+            raise HTTPException(status_code=404, detail="Event not found.")
+        if target_version >= event_info.version:
+            raise HTTPException(status_code=400, detail="Cannot rollback to current or future version")
+        difference = get_difference(db, event_id, from_version=target_version, to_version=event_info.version)
 
-    version_map = defaultdict(list)
+        recurrence = get_recurrence_by_event_id(db, event_id)
 
-    for log in logs:
+        #Loop through fields in dict, check which entities have the field, update the field and break for that field
+        for field, (old_val, _) in difference.items():
+            for entity in (event_info, recurrence):
+                if entity and hasattr(entity, field):
+                    current_val = getattr(entity, field)
+                    casted_val = cast_value(type(current_val), old_val)
+                    setattr(entity, field, casted_val)
+                    break
+        delete_change_logs_from_version_onwards(db, event_id, target_version+1)
+        delete_change_sets_from_version_onwards(db, event_id, target_version+1)
+        delete_event_snapshots_from_version_onwards(db, event_id, target_version+1)
+        event_info.version = target_version
 
-        version_map[log.new_version_id].append(ChangeLogEntry(
-            field_name=str(log.field_name),
-            old_val=str(log.old_val if log.old_val is not None else None),
-            new_val=str(log.new_val if log.new_val is not None else None),
-        ))
+        event_repo.save_event_info(db, event_info)
+        if recurrence:
+            event_repo.save_recurrence(db, recurrence)
 
-    changelog = [
-        EventVersionChangeLog(version=version, changes=changes)
-        for version, changes in sorted(version_map.items())
-    ]
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        logger.warning(f"Concurrent update of event {event_id} during rollback to version {target_version}")
+        raise HTTPException(status_code=409, detail="Event was modified concurrently, please retry.")
+    except HTTPException:
+        db.rollback()
+        raise
+    invalidate_cached_event(event_id)
+    history_cache.invalidate_from_version(event_id, target_version + 1)
 
-    return EventChangelogResponse(event_id=event_id, changelog=changelog)
+#For chronological ordering of logs
+def iter_changelog_versions(db: Session, event_id: int, from_version: int, to_version: int):
+    """Yields one EventVersionChangeLog per version with changes, built as that version's rows are read."""
+    logs = get_change_logs_in_version_range(db, event_id, from_version, to_version)
+    for version, rows in groupby(logs, key=itemgetter(0)):
+        yield EventVersionChangeLog(version=version, changes=[
+            ChangeLogEntry(field_name=str(field_name), old_val=str(old_val), new_val=str(new_val))
+            for _, field_name, old_val, new_val in rows
+        ])
+
+
+def get_event_changelog(
+    db: Session, event_id: int, current_version: int, cursor: str | None = None, limit: int | None = None
+) -> EventChangelogResponse:
+    """
+    Change log grouped by version. With a limit, a page covers `limit` consecutive versions and next_cursor
+    resumes after them; without one every version is returned, as before.
+    """
+    from_version = 1
+    if cursor:
+        try:
+            data = decode_cursor(cursor)
+            if data["event_id"] != event_id:
+                raise ValueError("Cursor belongs to another event")
+            from_version = int(data["version"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Malformed cursor")
+
+    to_version = current_version if limit is None else min(current_version, from_version + limit - 1)
+    changelog = list(iter_changelog_versions(db, event_id, from_version, to_version))
+
+    next_cursor = None
+    if to_version < current_version:
+        next_cursor = encode_cursor({"event_id": event_id, "version": to_version + 1})
+    return EventChangelogResponse(event_id=event_id, changelog=changelog, next_cursor=next_cursor)
+
+
+def stream_event_changelog(event_id: int, to_version: int):
+    """
+    Yields the change log as NDJSON, one version per line, serialized as it is read from a server-side
+    cursor. Opens its own session: the body is streamed after the request's session has been closed.
+    """
+    db = SessionLocal()
+    try:
+        for entry in iter_changelog_versions(db, event_id, 1, to_version):
+            yield entry.model_dump_json() + "\n"
+    finally:
+        db.close()
+
+async def stream_event_changelog_async(event_id: int, to_version: int):
+    """stream_event_changelog for DB_MODE=async: its own AsyncSession, the change log read through the async driver."""
+    async with AsyncSessionLocal() as db:
+        version, changes = None, []
+        rows = stream_change_logs_in_version_range(db, event_id, 1, to_version)
+        async for version_id, field_name, old_val, new_val in rows:
+            if version_id != version and changes:
+                yield EventVersionChangeLog(version=version, changes=changes).model_dump_json() + "\n"
+                changes = []
+            version = version_id
+            changes.append(ChangeLogEntry(field_name=str(field_name), old_val=str(old_val), new_val=str(new_val)))
+        if changes:
+            yield EventVersionChangeLog(version=version, changes=changes).model_dump_json() + "\n"
 
 def add_next_event(
     db: Session,
@@ -390,5 +683,6 @@ def add_next_event(
         event_id=event_id,
     start_time=new_start,
     end_time=new_end))
+    db.commit()
 
     return new_event
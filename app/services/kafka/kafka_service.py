@@ -3,6 +3,7 @@ from datetime import datetime
 from kafka.admin import NewTopic
 from sqlalchemy.orm import Session
 
+from app.core.event_cache import invalidate_cached_event
 from app.core.kafka_config import kafka_admin_client
 from app.db.session import get_db
 from app.repositories.auth import get_users_by_ids
@@ -35,6 +36,7 @@ def handle_db_update_start(msg: dict):
         db.commit()
     db.flush()
     add_next_event(db, event_id)
+    invalidate_cached_event(event_id)
 
 def handle_db_update_end(msg: dict):
     event_id = msg.get("event_id")
@@ -44,6 +46,7 @@ def handle_db_update_end(msg: dict):
         event.status = EventStatus.COMPLETED.value
         db.commit()
     db.flush()
+    invalidate_cached_event(event_id)
 
 def handle_notification_push(msg: dict):
     event_id = msg.get("event_id")
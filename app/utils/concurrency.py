@@ -0,0 +1,14 @@
+import asyncio
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+
+def run_blocking(fn, *args, **kwargs):
+    """
+    Calls a blocking function, such as a sync Redis command, from sync code. Inside AsyncSession.run_sync,
+    which runs on the event loop thread, the call is handed to a worker thread and awaited, so the loop
+    keeps serving other requests; anywhere else it is a plain call.
+    """
+    if in_greenlet():
+        return await_only(asyncio.to_thread(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
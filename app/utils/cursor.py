@@ -0,0 +1,18 @@
+import base64
+import json
+
+
+def encode_cursor(data: dict) -> str:
+    """Opaque pagination cursor: url-safe base64 of compact JSON."""
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Malformed cursor")
+    if not isinstance(data, dict):
+        raise ValueError("Malformed cursor")
+    return data
@@ -32,7 +32,7 @@ def map_to_event_version_response(data: dict) -> EventVersionResponse:
 def parse_typed_value(field: str, val: str):
     if val is None:
         return None
-    if field in {"hour", "day", "month", "year"}:
+    if field in {"hour", "day", "month", "year"} or field.startswith("recurrence_"):  # change logs use recurrence_<unit>
         return int(val)
     if field in {"id", "version"}:
         return int(val)
@@ -55,6 +55,22 @@ def cast_value(target_type, value: str):
         raise ValueError(f"Failed to cast {value} to {target_type}")
 
 
+def make_etag(*parts) -> str:
+    """Strong ETag from the values that determine a representation."""
+    return '"' + "-".join(str(getattr(part, "value", part)) for part in parts) + '"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored, "*" matches anything."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def schedule_members(occurrence_id: int) -> tuple[str, str]:
+    """Start and end members of an occurrence in the scheduler's sorted set."""
+    return f"{occurrence_id}:start", f"{occurrence_id}:end"
+
+
 def get_message(topic, event_id, timestamp):
     """Generate a subject and body message based on the topic, event_id, and timestamp."""
 
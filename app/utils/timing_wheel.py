@@ -0,0 +1,143 @@
+import math
+from typing import Hashable
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel of keyed deadlines. Level 0 has `slots` buckets of `tick` seconds; each level
+    above has `slots` buckets as wide as the whole level below, so the wheel reaches slots ** levels ticks
+    ahead. Insert and cancel are O(1); advancing visits one level 0 bucket per tick and, each time a level
+    wraps, moves one bucket of the level above down.
+
+    Buckets are created on first use and hold only keys; deadlines live in a single dict. An entry never
+    fires early, and at most one tick after its deadline, or after it was added if that is later.
+    Not thread-safe: use it from one event loop.
+    """
+
+    def __init__(self, tick: float, now: float, slots: int = 256, levels: int = 3):
+        self.tick = tick
+        self._slots = slots
+        self._levels = levels
+        self._spans = [slots ** level for level in range(levels)]
+        self._wheels: list[list[set | None]] = [[None] * slots for _ in range(levels)]
+        self._deadlines: dict[Hashable, float] = {}
+        # Keys on level 0, so runs of empty ticks are skipped a whole level 0 turn at a time
+        self._level0_keys = 0
+        # Next tick to expire; every tick before it has been
+        self._current = math.floor(now / tick)
+        self.fired = 0
+        self.rejected = 0
+
+    @property
+    def horizon(self) -> float:
+        """How far ahead of the current tick, in seconds, a deadline can be scheduled."""
+        return (self._slots - 1) * self._spans[-1] * self.tick
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable):
+        return key in self._deadlines
+
+    def _tick_of(self, deadline: float) -> int:
+        # An overdue entry goes to the next tick to expire
+        return max(math.ceil(deadline / self.tick), self._current)
+
+    def _place(self, key: Hashable, tick: int) -> bool:
+        # Lowest level whose buckets still reach the tick without wrapping past the current one
+        for level, span in enumerate(self._spans):
+            if tick // span - self._current // span < self._slots:
+                index = (tick // span) % self._slots
+                bucket = self._wheels[level][index]
+                if bucket is None:
+                    bucket = self._wheels[level][index] = set()
+                bucket.add(key)
+                if level == 0:
+                    self._level0_keys += 1
+                return True
+        return False
+
+    def schedule(self, key: Hashable, deadline: float) -> bool:
+        """Adds key, or moves it to a new deadline. Returns False when the deadline is beyond the horizon."""
+        self.cancel(key)
+        if not self._place(key, self._tick_of(deadline)):
+            self.rejected += 1
+            return False
+        self._deadlines[key] = deadline
+        return True
+
+    def cancel(self, key: Hashable) -> bool:
+        deadline = self._deadlines.pop(key, None)
+        if deadline is None:
+            return False
+        # Not yet cascaded down, the key sits at the bucket its tick maps to on exactly one level
+        tick = self._tick_of(deadline)
+        for level, span in enumerate(self._spans):
+            bucket = self._wheels[level][(tick // span) % self._slots]
+            if bucket is not None and key in bucket:
+                bucket.discard(key)
+                if level == 0:
+                    self._level0_keys -= 1
+                return True
+        return True
+
+    def _cascade(self):
+        # Top level first, so a bucket moved down onto a lower level's current bucket is moved on again
+        for level in range(self._levels - 1, 0, -1):
+            span = self._spans[level]
+            if self._current % span:
+                continue
+            index = (self._current // span) % self._slots
+            bucket = self._wheels[level][index]
+            if bucket is not None:
+                self._wheels[level][index] = None
+                for key in bucket:
+                    self._place(key, self._tick_of(self._deadlines[key]))
+
+    def advance(self, now: float) -> list[tuple[Hashable, float]]:
+        """Expires every tick up to now. Returns the (key, deadline) pairs due by now, removed from the wheel."""
+        target = math.floor(now / self.tick)
+        if not self._deadlines:
+            self._current = max(self._current, target + 1)
+            return []
+        due = []
+        level0 = self._wheels[0]
+        while self._current <= target:
+            self._cascade()
+            index = self._current % self._slots
+            bucket = level0[index]
+            if bucket is not None:
+                level0[index] = None
+                self._level0_keys -= len(bucket)
+                due.extend((key, self._deadlines.pop(key)) for key in bucket)
+            self._current += 1
+            if not self._deadlines:
+                self._current = target + 1
+            elif not self._level0_keys:
+                # Nothing before the next wrap, where the level above moves its next bucket down
+                self._current = min(target + 1, -(-self._current // self._slots) * self._slots)
+        self.fired += len(due)
+        return due
+
+    def next_expiry(self) -> float | None:
+        """
+        Earliest time advance() has work to do: the next non-empty level 0 bucket, or the next wrap of level 0
+        when a higher level has to move a bucket down first. None when the wheel is empty.
+        """
+        if not self._deadlines:
+            return None
+        level0 = self._wheels[0]
+        for tick in range(self._current, self._current + self._slots):
+            if level0[tick % self._slots] or (tick % self._slots == 0 and self._levels > 1):
+                return tick * self.tick
+        return (self._current + self._slots) * self.tick
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._deadlines),
+            "fired": self.fired,
+            "rejected": self.rejected,
+            "tick_seconds": self.tick,
+            "horizon_seconds": self.horizon,
+            "buckets_in_use": sum(bucket is not None for wheel in self._wheels for bucket in wheel),
+        }
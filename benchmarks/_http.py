@@ -0,0 +1,54 @@
+"""Small stdlib HTTP helpers shared by the benchmarks that run against a live server."""
+import json
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+
+def request(base_url: str, method: str, path: str, body=None, token: str | None = None, headers: dict | None = None):
+    """Returns (status, parsed body or None, elapsed seconds, response headers)."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    for name, value in (headers or {}).items():
+        req.add_header(name, value)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            raw, status, resp_headers = resp.read(), resp.status, dict(resp.headers)
+    except urllib.error.HTTPError as e:
+        raw, status, resp_headers = e.read(), e.code, dict(e.headers)
+    elapsed = time.perf_counter() - started
+    try:
+        parsed = json.loads(raw) if raw else None
+    except ValueError:
+        parsed = raw
+    return status, parsed, elapsed, resp_headers
+
+
+def register_user(base_url: str, password: str = "bench-password") -> tuple[str, str, int]:
+    """Registers a throwaway user. Returns (username, token, user_id)."""
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    phone = "9" + str(uuid.uuid4().int)[:9]
+    status, body, _, _ = request(base_url, "POST", "/api/auth/register", {
+        "username": username, "email": f"{username}@example.com", "password": password, "phone_number": phone,
+    })
+    if status != 200:
+        raise RuntimeError(f"Registration failed ({status}): {body}")
+    return username, body["token"], body["user"]["id"]
+
+
+def event_payload(index: int = 0, start: str = "2099-01-01T10:00:00Z", end: str = "2099-01-01T11:00:00Z") -> dict:
+    return {"title": f"bench event {index}", "description": "benchmark", "location": "bench",
+            "start_time": start, "end_time": end}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
@@ -0,0 +1,136 @@
+"""
+Requests/sec through the auth middleware, BaseHTTPMiddleware (before) vs pure ASGI (after).
+
+Drives a minimal app in-process over raw ASGI calls, so only the middleware and
+route dispatch are measured. Needs the database from app/.env for the session row.
+
+    python -m benchmarks.bench_auth_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt, JWTError
+from sqlalchemy.orm import Session
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.security import SECRET_KEY, ALGORITHM, create_access_token
+from app.core.session_cache import get_cached_session, cache_session, get_cache_generation
+from app.db.session import get_db, SessionLocal
+from app.middleware.middleware import JWTAuthMiddleware, ALLOWED_PREFIXES
+from app.repositories.auth import get_active_session_by_user_id, update_active_session
+
+BENCH_USER_ID = 999999
+
+
+class LegacyJWTAuthMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation this benchmark compares against."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.bearer = HTTPBearer(auto_error=False)
+
+    async def dispatch(self, request: Request, call_next):
+        db_gen = get_db()
+        db = next(db_gen)
+        try:
+            if any(request.url.path.startswith(prefix) for prefix in ALLOWED_PREFIXES):
+                credentials: HTTPAuthorizationCredentials = await self.bearer(request)
+                if not credentials or credentials.scheme.lower() != "bearer":
+                    return JSONResponse(status_code=401, content={"detail": "Missing or invalid token"})
+                try:
+                    payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+                except JWTError:
+                    return JSONResponse(status_code=401, content={"detail": "Invalid token"})
+                user_id = payload.get("user_id")
+                session = get_cached_session(user_id)
+                if not session:
+                    generation = get_cache_generation()
+                    db_session = get_active_session_by_user_id(db=db, user_id=user_id)
+                    if not db_session:
+                        return JSONResponse(status_code=401, content={"detail": "Session doesn't exist"})
+                    session = cache_session(db_session, generation)
+                expiration = session.token_expiration_timestamp.replace(tzinfo=timezone.utc)
+                if expiration <= datetime.now(timezone.utc) or session.token != credentials.credentials:
+                    return JSONResponse(status_code=401, content={"detail": "Invalid token"})
+                request.state.user_id = user_id
+            return await call_next(request)
+        finally:
+            db_gen.close()
+
+
+def build_app(middleware_cls) -> FastAPI:
+    app = FastAPI(middleware=[Middleware(middleware_cls)])
+
+    @app.get("/api/events/ping")
+    def protected(request: Request, db: Session = Depends(get_db)):
+        return {"user_id": request.state.user_id}
+
+    @app.get("/api/auth/ping")
+    def unprotected():
+        return {"ok": True}
+
+    return app
+
+
+async def call(app, path: str, token: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, path: str, token: str, requests: int, concurrency: int) -> float:
+    per_worker = requests // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            assert await call(app, path, token) == 200
+
+    await call(app, path, token)  # warm up caches and the connection pool
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return per_worker * concurrency / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "bench", "user_id": BENCH_USER_ID})
+    db = SessionLocal()
+    try:
+        update_active_session(db, BENCH_USER_ID, token)
+    finally:
+        db.close()
+
+    for name, middleware_cls in (("BaseHTTPMiddleware", LegacyJWTAuthMiddleware), ("pure ASGI", JWTAuthMiddleware)):
+        app = build_app(middleware_cls)
+        for path in ("/api/events/ping", "/api/auth/ping"):
+            rps = asyncio.run(measure(app, path, token, args.requests, args.concurrency))
+            print(f"{name:<20} {path:<20} {rps:>10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Throughput of POST /api/events/batch for growing batch sizes.
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_batch_create --base-url http://127.0.0.1:8000
+
+Run it once on the old per-event loop and once on the bulk path to compare; BULK_INSERT_CHUNK_SIZE
+on the server controls how many events go into each multi-row INSERT and transaction.
+"""
+import argparse
+import statistics
+
+from benchmarks._http import request, register_user, event_payload
+
+
+def run(base_url: str, sizes: list[int], repeats: int) -> None:
+    _, token, _ = register_user(base_url)
+    print(f"{'batch size':>10} {'median s':>10} {'events/s':>10}")
+    for size in sizes:
+        timings = []
+        for _ in range(repeats):
+            events = [
+                dict(event_payload(i), is_recurring=i % 2 == 0, recurrence_pattern={"hour": 0, "day": 1, "month": 0, "year": 0})
+                for i in range(size)
+            ]
+            status, body, elapsed, _ = request(base_url, "POST", "/api/events/batch", {"events": events}, token)
+            if status != 201 or len(body) != size:
+                raise RuntimeError(f"Batch of {size} failed ({status}): {str(body)[:200]}")
+            timings.append(elapsed)
+        median = statistics.median(timings)
+        print(f"{size:>10} {median:>10.3f} {size / median:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.base_url, args.sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Updates/sec when several writers edit the same event at once. Every update commits its new version and
+change log together; a writer that loses the optimistic lock on the event version retries on the
+server, and gets a 409 once EVENT_UPDATE_MAX_ATTEMPTS is exhausted.
+
+    uvicorn app.main:app --port 8000 --workers 4
+    python -m benchmarks.bench_concurrent_updates --base-url http://127.0.0.1:8000
+
+Afterwards the change log is checked: every version from 2 to the final one must have its rows.
+
+A second run mixes rollbacks into the concurrent updates. A rollback may lose to an update with a 409 or find
+the event already at its target with a 400, but never fail with a 500. A last rollback to version 2 must
+then restore version 2's title, undoing every update committed concurrently with the earlier rollbacks.
+"""
+import argparse
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._http import request, register_user, event_payload, percentile
+
+
+def run(base_url: str, writers: list[int], updates: int) -> None:
+    _, token, _ = register_user(base_url)
+    print(f"{'writers':>8} {'updates/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'409s':>6} {'errors':>7} {'log ok':>7}")
+    for count in writers:
+        status, body, _, _ = request(base_url, "POST", "/api/events/create", event_payload(count), token)
+        if status != 201:
+            raise RuntimeError(f"Event creation failed ({status}): {body}")
+        event_id = body["id"]
+
+        def update(i: int):
+            status, _, elapsed, _ = request(base_url, "PUT", f"/api/events/{event_id}", {"title": f"w{i}"}, token)
+            return status, elapsed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(count) as pool:
+            results = list(pool.map(update, range(updates)))
+        wall = time.perf_counter() - started
+
+        statuses = Counter(status for status, _ in results)
+        latencies = [elapsed * 1000 for status, elapsed in results if status == 200]
+        print(
+            f"{count:>8} {statuses[200] / wall:>10.0f} {statistics.median(latencies):>8.1f} "
+            f"{percentile(latencies, 99):>8.1f} {statuses[409]:>6} {updates - statuses[200] - statuses[409]:>7} "
+            f"{'yes' if change_log_complete(base_url, token, event_id) else 'NO':>7}"
+        )
+
+
+def run_rollbacks(base_url: str, writers: list[int], updates: int) -> None:
+    _, token, _ = register_user(base_url)
+    print(
+        f"{'writers':>8} {'rollbacks':>10} {'200s':>6} {'409s':>6} {'400s':>6} {'errors':>7} {'log ok':>7} "
+        f"{'restored':>9}"
+    )
+    for count in writers:
+        status, body, _, _ = request(base_url, "POST", "/api/events/create", event_payload(count), token)
+        if status != 201:
+            raise RuntimeError(f"Event creation failed ({status}): {body}")
+        event_id = body["id"]
+        for title in ("v2", "v3", "v4"):
+            request(base_url, "PUT", f"/api/events/{event_id}", {"title": title}, token)
+
+        def update_or_rollback(i: int):
+            if i % 4 == 0:
+                return "rollback", request(base_url, "POST", f"/api/events/{event_id}/rollback/2", token=token)[0]
+            return "update", request(base_url, "PUT", f"/api/events/{event_id}", {"title": f"w{i}"}, token)[0]
+
+        with ThreadPoolExecutor(count) as pool:
+            results = list(pool.map(update_or_rollback, range(updates)))
+
+        statuses = Counter(status for kind, status in results if kind == "rollback")
+        errors = sum(
+            1 for kind, status in results
+            if status not in (200, 409) and not (kind == "rollback" and status == 400)
+        )
+        log_ok = change_log_complete(base_url, token, event_id)
+        request(base_url, "POST", f"/api/events/{event_id}/rollback/2", token=token)
+        status, body, _, _ = request(base_url, "GET", f"/api/events/{event_id}", token=token)
+        restored = status == 200 and body["title"] == "v2" and body["version"] == 2
+        print(
+            f"{count:>8} {sum(statuses.values()):>10} {statuses[200]:>6} {statuses[409]:>6} {statuses[400]:>6} "
+            f"{errors:>7} {'yes' if log_ok else 'NO':>7} {'yes' if restored else 'NO':>9}"
+        )
+
+
+def change_log_complete(base_url: str, token: str, event_id: int) -> bool:
+    """Every committed version has change log rows, so no update was half-written."""
+    status, body, _, _ = request(base_url, "GET", f"/api/events/{event_id}", token=token)
+    if status != 200:
+        return False
+    status, log, _, _ = request(base_url, "GET", f"/api/events/{event_id}/changelog", token=token)
+    logged = {entry["version"] for entry in log["changelog"]} if status == 200 else set()
+    return logged == set(range(2, body["version"] + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--updates", type=int, default=200, help="updates per writer count")
+    args = parser.parse_args()
+    run(args.base_url, args.writers, args.updates)
+    run_rollbacks(args.base_url, args.writers, args.updates)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Throughput of the sync (threadpool) and async (AsyncSession) stacks side by side.
+
+Start one server per mode against the same database, then point the benchmark at both:
+
+    DB_MODE=sync  uvicorn app.main:app --port 8000
+    DB_MODE=async uvicorn app.main:app --port 8001
+    python -m benchmarks.bench_db_modes --url sync=http://127.0.0.1:8000 --url async=http://127.0.0.1:8001
+"""
+import argparse
+import threading
+import time
+
+from benchmarks._http import request, register_user, event_payload, percentile
+
+
+def run_load(base_url: str, token: str, event_id: int, concurrency: int, duration: float) -> dict:
+    stop = threading.Event()
+    latencies = {"GET /api/events/{id}": [], "POST /api/events": []}
+    errors = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal errors
+        while not stop.is_set():
+            for name, (method, path, body) in (
+                ("GET /api/events/{id}", ("GET", f"/api/events/{event_id}", None)),
+                ("POST /api/events", ("POST", "/api/events", {"limit": 10})),
+            ):
+                status, _, elapsed, _ = request(base_url, method, path, body, token)
+                with lock:
+                    latencies[name].append(elapsed)
+                    errors += status != 200
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {"latencies": latencies, "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", action="append", required=True, help="label=base_url, repeatable")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    for label, base_url in (target.split("=", 1) for target in args.url):
+        _, token, _ = register_user(base_url)
+        status, event, _, _ = request(base_url, "POST", "/api/events/create", event_payload(), token)
+        if status != 201:
+            raise RuntimeError(f"Event creation failed on {label} ({status}): {event}")
+
+        for concurrency in args.concurrency:
+            result = run_load(base_url, token, event["id"], concurrency, args.duration)
+            for name, samples in result["latencies"].items():
+                print(f"{label:<8} c={concurrency:<4} {name:<22} {len(samples) / args.duration:8.1f} req/s "
+                      f"p50={percentile(samples, 50) * 1000:7.1f}ms p99={percentile(samples, 99) * 1000:7.1f}ms")
+            if result["errors"]:
+                print(f"{label:<8} c={concurrency:<4} non-200 responses: {result['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Latency of the events endpoints while a storm of logins runs against the same server.
+
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_login_storm --base-url http://127.0.0.1:8000 --login-threads 64
+
+Compare a run against the previous release with one against this tree: with the bounded
+password pool, excess logins get 503 and GET /api/events/{id} keeps its p99.
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from benchmarks._http import request, register_user, event_payload, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--login-threads", type=int, default=64)
+    parser.add_argument("--reader-threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    password = "bench-password"
+    username, token, _ = register_user(args.base_url, password)
+    status, event, _, _ = request(args.base_url, "POST", "/api/events/create", event_payload(), token)
+    if status != 201:
+        raise RuntimeError(f"Event creation failed ({status}): {event}")
+
+    stop = threading.Event()
+    login_statuses = Counter()
+    read_latencies = {"get": [], "filter": []}
+    lock = threading.Lock()
+
+    def login_worker():
+        while not stop.is_set():
+            status, _, _, _ = request(args.base_url, "POST", "/api/auth/login",
+                                      {"username": username, "password": password})
+            with lock:
+                login_statuses[status] += 1
+
+    def reader_worker():
+        while not stop.is_set():
+            _, _, get_elapsed, _ = request(args.base_url, "GET", f"/api/events/{event['id']}", token=token)
+            _, _, filter_elapsed, _ = request(args.base_url, "POST", "/api/events", {"limit": 10}, token)
+            with lock:
+                read_latencies["get"].append(get_elapsed)
+                read_latencies["filter"].append(filter_elapsed)
+
+    # Baseline latency first, then the same readers under the storm
+    for phase, login_threads in (("idle", 0), ("login storm", args.login_threads)):
+        stop.clear()
+        login_statuses.clear()
+        for samples in read_latencies.values():
+            samples.clear()
+        threads = [threading.Thread(target=login_worker) for _ in range(login_threads)]
+        threads += [threading.Thread(target=reader_worker) for _ in range(args.reader_threads)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        print(f"== {phase} ({login_threads} login threads)")
+        for name, samples in read_latencies.items():
+            print(f"  {name:<7} n={len(samples):<6} p50={percentile(samples, 50) * 1000:8.1f}ms "
+                  f"p99={percentile(samples, 99) * 1000:8.1f}ms")
+        if login_statuses:
+            print(f"  logins  {dict(login_statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Microbenchmark of the dispatcher's near-term schedule: the in-process timing wheel against the Redis sorted
+set it fronts. Both get the same pending triggers spread over the scraper's window, cancel a tenth of them,
+then drain the window tick by tick on a simulated clock:
+
+- wheel: schedule/cancel per member, one advance() per TIMING_WHEEL_TICK_SECONDS
+- zset: pipelined ZADD/ZREM chunks like the scraper, one atomic claim round-trip per --zset-step seconds
+
+    python -m benchmarks.bench_timing_wheel                          # in-process fake Redis
+    python -m benchmarks.bench_timing_wheel --redis-url redis://localhost:6379/15
+
+The fake Redis needs fakeredis with Lua support (pip install "fakeredis[lua]") and mostly measures Python;
+a real Redis shows the network round-trip. Against a real Redis the events sorted set of that database is
+overwritten, so point it at a scratch database. Wheel memory is what tracemalloc sees beyond the member
+strings themselves; sorted set memory is MEMORY USAGE, only available on a real Redis.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+
+from app.core.config import REDIS_EVENTS_ZSET, TIMING_WHEEL_TICK_SECONDS, POLLER_CLAIM_BATCH_SIZE, \
+    REDIS_PIPELINE_CHUNK_SIZE
+from app.core.event_queue import claim_due_members
+from app.utils.timing_wheel import TimingWheel
+
+NOW = 1_000_000.0
+
+
+def make_triggers(count: int, window: float) -> tuple[dict, list]:
+    """count members due uniformly over the window, and the tenth of them to cancel."""
+    rng = random.Random(count)
+    triggers = {f"{i // 2}:{'start' if i % 2 == 0 else 'end'}": NOW + rng.uniform(0, window) for i in range(count)}
+    return triggers, rng.sample(list(triggers), count // 10)
+
+
+def load_wheel(triggers: dict) -> TimingWheel:
+    wheel = TimingWheel(tick=TIMING_WHEEL_TICK_SECONDS, now=NOW)
+    for member, score in triggers.items():
+        wheel.schedule(member, score)
+    return wheel
+
+
+def bench_wheel(triggers: dict, cancelled: list, window: float) -> dict:
+    # Measured apart, as tracing every allocation slows the inserts down
+    tracemalloc.start()
+    wheel = load_wheel(triggers)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del wheel
+
+    started = time.perf_counter()
+    wheel = load_wheel(triggers)
+    insert = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for member in cancelled:
+        wheel.cancel(member)
+    cancel = time.perf_counter() - started
+
+    ticks = round(window / TIMING_WHEEL_TICK_SECONDS) + 1
+    fired = 0
+    started = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        fired += len(wheel.advance(NOW + tick * TIMING_WHEEL_TICK_SECONDS))
+    drain = time.perf_counter() - started
+    return {"insert": insert, "cancel": cancel, "drain": drain, "ticks": ticks, "fired": fired, "memory": memory}
+
+
+async def bench_zset(client, triggers: dict, cancelled: list, window: float, step: float, real: bool) -> dict:
+    await client.delete(REDIS_EVENTS_ZSET)
+    items = list(triggers.items())
+    started = time.perf_counter()
+    async with client.pipeline(transaction=True) as pipe:
+        for start in range(0, len(items), REDIS_PIPELINE_CHUNK_SIZE):
+            pipe.zadd(REDIS_EVENTS_ZSET, dict(items[start:start + REDIS_PIPELINE_CHUNK_SIZE]))
+        await pipe.execute()
+    insert = time.perf_counter() - started
+    memory = await client.memory_usage(REDIS_EVENTS_ZSET) if real else None
+
+    started = time.perf_counter()
+    async with client.pipeline(transaction=True) as pipe:
+        for start in range(0, len(cancelled), REDIS_PIPELINE_CHUNK_SIZE):
+            pipe.zrem(REDIS_EVENTS_ZSET, *cancelled[start:start + REDIS_PIPELINE_CHUNK_SIZE])
+        await pipe.execute()
+    cancel = time.perf_counter() - started
+
+    ticks = round(window / step) + 1
+    fired = 0
+    started = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        while True:
+            batch = await claim_due_members(NOW + tick * step, POLLER_CLAIM_BATCH_SIZE, client=client)
+            fired += len(batch)
+            if len(batch) < POLLER_CLAIM_BATCH_SIZE:
+                break
+    drain = time.perf_counter() - started
+    await client.delete(REDIS_EVENTS_ZSET)
+    return {"insert": insert, "cancel": cancel, "drain": drain, "ticks": ticks, "fired": fired, "memory": memory}
+
+
+def print_row(name: str, pending: int, cancelled: int, result: dict):
+    memory = f"{result['memory'] / pending:.0f}" if result["memory"] is not None else "n/a"
+    print(
+        f"{name:>6} {pending:>8} {result['insert'] / pending * 1e6:>10.2f} {result['cancel'] / cancelled * 1e6:>10.2f} "
+        f"{result['ticks']:>7} {result['drain'] / result['ticks'] * 1e6:>10.1f} {result['drain']:>8.2f} "
+        f"{memory:>8} {result['fired']:>8}"
+    )
+
+
+async def main_async(args) -> int:
+    if args.redis_url:
+        import redis.asyncio
+        client = redis.asyncio.Redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+        client = fakeredis.FakeAsyncRedis()
+
+    failed = False
+    print(
+        f"{'':>6} {'pending':>8} {'insert us':>10} {'cancel us':>10} {'ticks':>7} {'tick us':>10} "
+        f"{'drain s':>8} {'B/member':>8} {'fired':>8}"
+    )
+    for pending in args.pending:
+        triggers, cancelled = make_triggers(pending, args.window)
+        expected = pending - len(cancelled)
+        wheel = bench_wheel(triggers, cancelled, args.window)
+        print_row("wheel", pending, len(cancelled), wheel)
+        zset = await bench_zset(client, triggers, cancelled, args.window, args.zset_step, bool(args.redis_url))
+        print_row("zset", pending, len(cancelled), zset)
+        failed |= wheel["fired"] != expected or zset["fired"] != expected
+    await client.aclose()
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=None, help="real Redis to run against instead of the fake")
+    parser.add_argument("--pending", type=int, nargs="+", default=[10_000, 100_000, 300_000])
+    parser.add_argument("--window", type=float, default=600, help="seconds the triggers are spread over")
+    parser.add_argument("--zset-step", type=float, default=1.0, help="seconds between sorted set claims")
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
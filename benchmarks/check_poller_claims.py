@@ -0,0 +1,116 @@
+"""
+Concurrency check for the poller's atomic claim: N pollers, each with its own connection, drain the same
+due members at once, and every member must be claimed by exactly one of them.
+
+    python -m benchmarks.check_poller_claims                          # in-process fake Redis
+    python -m benchmarks.check_poller_claims --redis-url redis://localhost:6379/15
+
+The fake Redis needs fakeredis with Lua support (pip install "fakeredis[lua]"). Against a real Redis the
+events sorted set of that database is overwritten, so point it at a scratch database. The old
+read-then-ZREM loop runs too and must show duplicates, or the check did not reproduce the race; the atomic
+claim must show none. With a single poller there is no race, so neither may show any. A last check claims
+timing wheel members by name after one of them was rescheduled past the wheel's deadline.
+"""
+import argparse
+import asyncio
+import sys
+from collections import Counter
+
+from app.core.config import REDIS_EVENTS_ZSET
+from app.core.event_queue import claim_due_members, claim_members
+
+NOW = 1_000_000.0
+
+
+def make_clients(redis_url: str | None, count: int) -> list:
+    if redis_url:
+        import redis.asyncio
+        return [redis.asyncio.Redis.from_url(redis_url) for _ in range(count)]
+    import fakeredis
+    server = fakeredis.FakeServer()
+    return [fakeredis.FakeAsyncRedis(server=server) for _ in range(count)]
+
+
+async def atomic_poller(client, batch_size: int) -> list[bytes]:
+    claimed = []
+    while True:
+        batch = await claim_due_members(NOW, batch_size, client=client)
+        claimed.extend(member for member, _ in batch)
+        await asyncio.sleep(0)  # handling the batch lets the other pollers run
+        if len(batch) < batch_size:
+            return claimed
+
+
+async def legacy_poller(client, batch_size: int) -> list[bytes]:
+    claimed = []
+    due = await client.zrangebyscore(REDIS_EVENTS_ZSET, "-inf", NOW)
+    await asyncio.sleep(0)  # the other pollers read the same members before this one removes them
+    for member in due:
+        await client.zrem(REDIS_EVENTS_ZSET, member)
+        claimed.append(member)
+    return claimed
+
+
+async def run(poller, clients: list, members: int, batch_size: int) -> tuple[int, int, int]:
+    """Returns (claims, duplicated members, missing members)."""
+    await clients[0].delete(REDIS_EVENTS_ZSET)
+    expected = {f"{i}:start".encode(): NOW - members + i for i in range(members)}
+    await clients[0].zadd(REDIS_EVENTS_ZSET, expected)
+    # A member due later must never be claimed
+    await clients[0].zadd(REDIS_EVENTS_ZSET, {b"future:start": NOW + 60})
+
+    results = await asyncio.gather(*(poller(client, batch_size) for client in clients))
+    counts = Counter(member for claimed in results for member in claimed)
+    duplicates = sum(1 for count in counts.values() if count > 1)
+    missing = len(expected.keys() - counts.keys()) + (b"future:start" in counts)
+    await clients[0].delete(REDIS_EVENTS_ZSET)
+    return sum(counts.values()), duplicates, missing
+
+
+async def check_rescheduled(client) -> bool:
+    """
+    A wheel fires "moved:start" at its old deadline after another worker moved it to NOW + 60: the claim
+    must skip it and leave it scheduled, while still claiming "kept:start", which is due.
+    """
+    await client.delete(REDIS_EVENTS_ZSET)
+    await client.zadd(REDIS_EVENTS_ZSET, {b"kept:start": NOW - 1, b"moved:start": NOW + 60})
+    claimed = await claim_members(["kept:start", "moved:start", "gone:start"], NOW, client=client)
+    remaining = await client.zrange(REDIS_EVENTS_ZSET, 0, -1, withscores=True)
+    await client.delete(REDIS_EVENTS_ZSET)
+    return claimed == [(b"kept:start", NOW - 1)] and remaining == [(b"moved:start", NOW + 60)]
+
+
+async def main_async(args) -> int:
+    failed = False
+    print(f"{'claim':>7} {'pollers':>8} {'members':>8} {'claims':>7} {'dupes':>6} {'wrong':>6}")
+    for pollers in args.pollers:
+        clients = make_clients(args.redis_url, pollers)
+        for name, poller in (("legacy", legacy_poller), ("atomic", atomic_poller)):
+            claims, duplicates, missing = await run(poller, clients, args.members, args.batch_size)
+            if name == "atomic" or pollers == 1:
+                failed |= bool(duplicates or missing)
+            else:
+                failed |= not duplicates
+            print(f"{name:>7} {pollers:>8} {args.members:>8} {claims:>7} {duplicates:>6} {missing:>6}")
+        for client in clients:
+            await client.aclose()
+
+    client = make_clients(args.redis_url, 1)[0]
+    rescheduled_ok = await check_rescheduled(client)
+    await client.aclose()
+    failed |= not rescheduled_ok
+    print(f"rescheduled member left in place: {'ok' if rescheduled_ok else 'FAILED'}")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default=None, help="real Redis to run against instead of the fake")
+    parser.add_argument("--pollers", type=int, nargs="+", default=[1, 2, 8, 32])
+    parser.add_argument("--members", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
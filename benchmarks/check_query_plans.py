@@ -0,0 +1,68 @@
+"""
+Query-plan regression check: EXPLAINs the hot queries and exits non-zero if any of them has to
+scan a whole table because no index applies.
+
+    python -m benchmarks.check_query_plans
+
+Runs against the (migrated) database configured in app/.env, MySQL or SQLite. On MySQL a table access
+fails when it is a full scan (type ALL) with no candidate index, so a small table the optimizer
+chooses to scan anyway does not fail the check.
+"""
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from app.db.models.events import ChangeLog, ChangeSet, Event, EventAccess, EventInfo
+from app.db.session import SessionLocal
+from app.utils import EventStatus
+
+NOW = datetime(2030, 1, 1)
+
+QUERIES = {
+    "access by user and event": select(EventAccess).where(EventAccess.user_id == 1, EventAccess.event_id == 1),
+    "accesses of an event": select(EventAccess).where(EventAccess.event_id == 1),
+    "latest scheduled occurrence": select(Event).where(Event.event_id == 1, Event.status == EventStatus.SCHEDULED),
+    "scraper time window": select(Event).where(Event.start_time >= NOW, Event.start_time < NOW + timedelta(hours=1)),
+    "scraper changes since watermark": select(Event.id, Event.start_time, Event.end_time, Event.status).where(Event.updated_at > NOW),
+    "change log from a version": select(ChangeLog).where(ChangeLog.event_id == 1, ChangeLog.new_version_id >= 2),
+    "change sets from a version": select(ChangeSet).where(ChangeSet.event_id == 1, ChangeSet.new_version_id >= 2),
+    "event filter page": (
+        select(Event, EventInfo, EventAccess)
+        .join(EventInfo, Event.event_id == EventInfo.id)
+        .join(EventAccess, Event.event_id == EventAccess.event_id)
+        .where(EventAccess.user_id == 1)
+        .order_by(Event.start_time, Event.id)
+        .limit(10)
+    ),
+}
+
+
+def full_scans(conn: Connection, statement) -> list[str]:
+    sql = str(statement.compile(conn, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "mysql":
+        rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+        return [
+            f"{row['table']} (type={row['type']})"
+            for row in rows if row["type"] == "ALL" and not row["possible_keys"]
+        ]
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return [row[-1] for row in rows if row[-1].startswith("SCAN") and " USING " not in row[-1]]
+    raise SystemExit(f"Unsupported dialect: {conn.dialect.name}")
+
+
+def main() -> int:
+    failed = False
+    with SessionLocal() as db:
+        conn = db.connection()
+        for name, statement in QUERIES.items():
+            scans = full_scans(conn, statement)
+            failed |= bool(scans)
+            print(f"{'FAIL' if scans else 'ok':<5} {name}" + (f": full scan of {', '.join(scans)}" if scans else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())